@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 
 def display_bulk_deals(deals_df):
     """Displays the bulk deals data in a table."""
@@ -15,11 +16,25 @@ def display_bulk_deals(deals_df):
     # if selected_symbol != 'All':
     #     deals_df = deals_df[deals_df['Symbol'] == selected_symbol]
 
+    if not all(isinstance(dtype, pd.ArrowDtype) for dtype in deals_df.dtypes):
+        deals_df = deals_df.convert_dtypes(dtype_backend='pyarrow') # One-time conversion for st.dataframe
     st.dataframe(deals_df, use_container_width=True)
 
     # Prepare context for Gemini (e.g., summarize top deals)
+    return _build_deals_context(deals_df)
+
+@st.cache_data(show_spinner=False)
+def _build_deals_context(deals_df):
+    """Top-5 deals summary for Gemini, cached on the DataFrame contents so reruns skip the formatting."""
+    # Top 5 by quantity: O(n) argpartition, then sort only those 5 rows
+    quantity = deals_df['Quantity'].to_numpy(dtype=np.float64, na_value=np.nan)
+    if len(quantity) > 5:
+        top_idx = np.argpartition(-quantity, 5)[:5]
+        top_idx = top_idx[np.argsort(-quantity[top_idx], kind='stable')]
+    else:
+        top_idx = np.argsort(-quantity, kind='stable')
     deals_context = f"""
     Recent Bulk/Block Deals Summary (Top 5 by Quantity):
-    {deals_df.nlargest(5, 'Quantity').to_string()}
+    {deals_df.iloc[top_idx].to_string()}
     """
-    return deals_context
\ No newline at end of file
+    return deals_context
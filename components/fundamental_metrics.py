@@ -1,6 +1,32 @@
 import streamlit as st
 import pandas as pd
 
+# Fields from the yfinance info dict used in the Gemini context
+_CONTEXT_KEYS = ('symbol', 'longName', 'sector', 'industry', 'marketCap', 'forwardPE', 'trailingPE',
+                 'priceToBook', 'pegRatio', 'profitMargins', 'returnOnEquity', 'revenueGrowth',
+                 'debtToEquity', 'dividendYield', 'longBusinessSummary')
+
+@st.cache_data(show_spinner=False)
+def _build_fundamental_context(ticker, info_hashable):
+    """Builds the Gemini context string from a tuple of (key, value) info pairs."""
+    info = dict(info_hashable)
+    return f"""
+    Fundamental Data for {info.get('symbol', ticker)} ({info.get('longName', '')}):
+    Sector: {info.get('sector', 'N/A')}
+    Industry: {info.get('industry', 'N/A')}
+    Market Cap: {info.get('marketCap', 0):,}
+    Forward P/E: {info.get('forwardPE', 'N/A')}
+    Trailing P/E: {info.get('trailingPE', 'N/A')}
+    Price/Book: {info.get('priceToBook', 'N/A')}
+    PEG Ratio: {info.get('pegRatio', 'N/A')}
+    Profit Margin: {info.get('profitMargins', 0):.2%}
+    ROE (TTM): {info.get('returnOnEquity', 0):.2%}
+    Revenue Growth (YoY): {info.get('revenueGrowth', 0):.2%}
+    Debt/Equity: {info.get('debtToEquity', 'N/A')}
+    Dividend Yield: {info.get('dividendYield', 0):.2%}
+    Business Summary: {info.get('longBusinessSummary', 'N/A')[:500]}...
+    """
+
 def display_fundamental_metrics(ticker, info):
     """Displays key fundamental metrics in a structured way."""
     if not info:
@@ -53,26 +79,18 @@ def display_fundamental_metrics(ticker, info):
     st.subheader("Summary")
     st.expander("Business Summary").write(info.get('longBusinessSummary', 'No summary available.'))
 
-    # Prepare data for Gemini
-    fundamental_context = f"""
-    Fundamental Data for {info.get('symbol', ticker)} ({info.get('longName', '')}):
-    Sector: {info.get('sector', 'N/A')}
-    Industry: {info.get('industry', 'N/A')}
-    Market Cap: {info.get('marketCap', 0):,}
-    Forward P/E: {info.get('forwardPE', 'N/A')}
-    Trailing P/E: {info.get('trailingPE', 'N/A')}
-    Price/Book: {info.get('priceToBook', 'N/A')}
-    PEG Ratio: {info.get('pegRatio', 'N/A')}
-    Profit Margin: {info.get('profitMargins', 0):.2%}
-    ROE (TTM): {info.get('returnOnEquity', 0):.2%}
-    Revenue Growth (YoY): {info.get('revenueGrowth', 0):.2%}
-    Debt/Equity: {info.get('debtToEquity', 'N/A')}
-    Dividend Yield: {info.get('dividendYield', 0):.2%}
-    Business Summary: {info.get('longBusinessSummary', 'N/A')[:500]}...
-    """
+    # Prepare data for Gemini (cached on the handful of fields it uses)
+    info_hashable = tuple((key, info.get(key)) for key in _CONTEXT_KEYS if key in info)
+    fundamental_context = _build_fundamental_context(ticker, info_hashable)
     return fundamental_context
 
 
+def _as_arrow_backed(df):
+    """Returns df with pyarrow-backed columns (no-op if it already is) so st.dataframe skips the Arrow conversion."""
+    if all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+        return df
+    return df.convert_dtypes(dtype_backend='pyarrow')
+
 def display_recommendations(ticker, recommendations):
     """Displays analyst recommendations."""
     st.subheader(f"Analyst Recommendations for {ticker}")
@@ -80,7 +98,7 @@ def display_recommendations(ticker, recommendations):
         st.write("No recommendation data available.")
         return
 
-    st.dataframe(recommendations.head(), use_container_width=True)
+    st.dataframe(_as_arrow_backed(recommendations.head()), use_container_width=True)
     # Could add a chart showing trend of recommendations over time
 
 def display_earnings_history(ticker, earnings):
@@ -90,5 +108,5 @@ def display_earnings_history(ticker, earnings):
         st.write("No earnings history available.")
         return
 
-    st.dataframe(earnings, use_container_width=True)
+    st.dataframe(_as_arrow_backed(earnings), use_container_width=True)
     # Could add a chart comparing Actual vs Estimate EPS
\ No newline at end of file
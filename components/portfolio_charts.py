@@ -12,20 +12,24 @@ def plot_efficient_frontier(results_df, risk_free_rate):
     fig = go.Figure()
 
     # Scatter plot for all generated portfolios on the frontier
-    fig.add_trace(go.Scatter(
-        x=results_df['Volatility'],
-        y=results_df['Return'],
+    # WebGL trace keeps pan/zoom smooth for large point clouds; float32 arrays use typed-array transport
+    sharpe = results_df['Sharpe Ratio'].to_numpy(dtype=np.float32)
+    ret = results_df['Return'].to_numpy(dtype=np.float32)
+    vol = results_df['Volatility'].to_numpy(dtype=np.float32)
+    fig.add_trace(go.Scattergl(
+        x=vol,
+        y=ret,
         mode='markers',
         marker=dict(
             size=8,
-            color=results_df['Sharpe Ratio'], # Color by Sharpe Ratio
+            color=sharpe, # Color by Sharpe Ratio
             colorscale='YlGnBu', # Choose a colorscale
             showscale=True,
             colorbar=dict(title='Sharpe Ratio')
         ),
-        text=[f"Sharpe: {sr:.2f}<br>Return: {r:.2%}<br>Vol: {v:.2%}"
-              for sr, r, v in zip(results_df['Sharpe Ratio'], results_df['Return'], results_df['Volatility'])],
-        hoverinfo='text',
+        # Hover text is formatted client-side from the raw floats
+        customdata=np.column_stack([sharpe, ret, vol]),
+        hovertemplate="Sharpe: %{customdata[0]:.2f}<br>Return: %{customdata[1]:.2%}<br>Vol: %{customdata[2]:.2%}<extra></extra>",
         name='Efficient Frontier Portfolios'
     ))
 
@@ -76,8 +80,13 @@ def display_portfolio_summary(portfolio_results, portfolio_name):
          return pd.Series(), "" # Return empty series and context
 
      stats = portfolio_results.loc[portfolio_name, ['Return', 'Volatility', 'Sharpe Ratio']]
-     weights = portfolio_results.loc[portfolio_name].drop(['Return', 'Volatility', 'Sharpe Ratio'])
-     weights = weights[weights > 0.0001] # Filter out negligible weights for display
+     # Split stats from weights and drop negligible weights on plain arrays before any pandas work
+     values = portfolio_results.loc[portfolio_name].to_numpy(dtype=np.float64)
+     columns = portfolio_results.columns.to_numpy()
+     is_weight = ~np.isin(columns, ['Return', 'Volatility', 'Sharpe Ratio'])
+     weights, tickers = values[is_weight], columns[is_weight]
+     keep = weights > 0.0001 # Filter out negligible weights for display
+     weights, tickers = weights[keep], tickers[keep]
 
      st.subheader(f"Optimal Portfolio: {portfolio_name}")
      col1, col2, col3 = st.columns(3)
@@ -87,15 +96,17 @@ def display_portfolio_summary(portfolio_results, portfolio_name):
 
      st.subheader("Optimal Weights")
      # Use a bar chart or pie chart for weights
-     fig_weights = go.Figure(data=[go.Pie(labels=weights.index, values=weights.values, hole=.3,
+     fig_weights = go.Figure(data=[go.Pie(labels=tickers, values=weights, hole=.3,
                                          textinfo='label+percent', pull=[0.05] * len(weights))])
      fig_weights.update_layout(title_text='Portfolio Allocation', showlegend=False)
      st.plotly_chart(fig_weights, use_container_width=True)
 
-     st.dataframe(weights.map('{:.2%}'.format), use_container_width=True) # Show weights in a table too
+     # Format all weights in one vectorized pass and reuse the strings for the table and the Gemini context
+     weights_pct = np.char.mod('%.2f%%', weights * 100)
+     st.dataframe(pd.Series(weights_pct, index=tickers, name=portfolio_name), use_container_width=True) # Show weights in a table too
 
      # Prepare context for Gemini
-     weights_str = "\n".join([f"- {ticker}: {weight:.2%}" for ticker, weight in weights.items()])
+     weights_str = "\n".join(f"- {ticker}: {pct}" for ticker, pct in zip(tickers, weights_pct))
      portfolio_context = f"""
      Optimized Portfolio ({portfolio_name}):
      Expected Annual Return: {stats['Return']:.2%}
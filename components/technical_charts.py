@@ -1,87 +1,143 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from utils.indicators_nb import ema_nb, price_overlays
 
 # --- Technical Indicator Calculations (should ideally be in utils) ---
-def calculate_sma(data, window):
-    return data.rolling(window=window).mean()
-
-def calculate_ema(data, span):
-    return data.ewm(span=span, adjust=False).mean()
-
+# Indicator outputs are float32: plenty for charting, half the bytes sent to Plotly.
+# The indicator math itself runs in float64 whatever the input price dtype.
 def calculate_rsi(data, window=14):
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
+    # Wilder's RSI: gains/losses smoothed with an EMA (alpha=1/window) in one ewm pass each
+    delta = data.diff().to_numpy(dtype=np.float64)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = pd.Series(gain, index=data.index).ewm(alpha=1 / window, adjust=False).mean()
+    avg_loss = pd.Series(loss, index=data.index).ewm(alpha=1 / window, adjust=False).mean()
+    rs = avg_gain / avg_loss # No losses -> inf -> RSI of 100
     rsi = 100 - (100 / (1 + rs))
-    return rsi
+    rsi.iloc[:window] = np.nan # Warm-up period, as with the rolling version
+    return rsi.astype(np.float32, copy=False)
 
 def calculate_macd(data, span1=12, span2=26, signal=9):
-    ema1 = calculate_ema(data, span1)
-    ema2 = calculate_ema(data, span2)
-    macd_line = ema1 - ema2
-    signal_line = calculate_ema(macd_line, signal)
+    # Three jitted EMA passes on a float64 array; pandas objects only at the boundary.
+    # EMAs stay float64 until the end: the MACD line is a small difference of two large values
+    x = np.ascontiguousarray(data.to_numpy(dtype=np.float64))
+    macd_line = ema_nb(x, span1) - ema_nb(x, span2)
+    signal_line = ema_nb(macd_line, signal)
     histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
-
-def calculate_bollinger_bands(data, window=20, num_std_dev=2):
-    sma = calculate_sma(data, window)
-    std_dev = data.rolling(window=window).std()
-    upper_band = sma + (std_dev * num_std_dev)
-    lower_band = sma - (std_dev * num_std_dev)
-    return upper_band, sma, lower_band
+    index = data.index
+    return (pd.Series(macd_line.astype(np.float32), index=index),
+            pd.Series(signal_line.astype(np.float32), index=index),
+            pd.Series(histogram.astype(np.float32), index=index))
+
+def compute_price_overlays(price, bb_window=20, num_std_dev=2, fast_window=50, slow_window=200):
+    """Bollinger Bands and the 50/200-day SMAs from a single pass over a NaN-free price array."""
+    x = np.ascontiguousarray(price, dtype=np.float64)
+    sma20, upper, lower, sma50, sma200 = price_overlays(x, bb_window, float(num_std_dev),
+                                                        fast_window, slow_window)
+    return {'sma20': sma20.astype(np.float32),
+            'upper': upper.astype(np.float32), 'lower': lower.astype(np.float32),
+            'sma50': sma50.astype(np.float32), 'sma200': sma200.astype(np.float32)}
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _compute_indicators_cached(ticker, price_key, _price_series):
+    """Computes all indicators for a price series. The underscore-prefixed series is not
+    hashed by Streamlit; (ticker, _series_key(series)) identifies it instead."""
+    index = _price_series.index
+    overlays = compute_price_overlays(_price_series.to_numpy())
+    macd_line, signal_line, histogram = calculate_macd(_price_series)
+    return {
+        'upper_band': pd.Series(overlays['upper'], index=index),
+        'middle_band': pd.Series(overlays['sma20'], index=index),
+        'lower_band': pd.Series(overlays['lower'], index=index),
+        'sma50': pd.Series(overlays['sma50'], index=index),
+        'sma200': pd.Series(overlays['sma200'], index=index),
+        'rsi': calculate_rsi(_price_series),
+        'macd_line': macd_line,
+        'signal_line': signal_line,
+        'histogram': histogram,
+    }
+
+def compute_indicators(ticker, price_series):
+    """Returns cached indicators for a ticker's price series (keyed on its fingerprint, checksum
+    included, so revised historical prices recompute like the figure does)."""
+    return _compute_indicators_cached(ticker, _series_key(price_series), price_series)
 
 # --- Plotting Functions ---
+def _to_f32(series):
+    """Indicator values as a float32 ndarray (already float32, so normally no copy)."""
+    return series.to_numpy().astype(np.float32, copy=False)
+
+def _series_key(series):
+    """Cheap hashable fingerprint of a Series: (last index, length, checksum)."""
+    if series.empty:
+        return (None, 0, 0.0)
+    return (series.index[-1], len(series), float(np.nansum(series.to_numpy())))
+
 def plot_technical_analysis(ticker, df_ticker_price, df_ticker_volume):
     """Plots Price, Volume, MA, Bollinger Bands, RSI, MACD."""
     if df_ticker_price.empty:
         st.warning(f"No price data to plot for {ticker}.")
         return go.Figure(), "" # Return empty figure and context
 
+    return _build_ta_figure(ticker, _series_key(df_ticker_price), _series_key(df_ticker_volume),
+                            df_ticker_price, df_ticker_volume)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_ta_figure(ticker, price_key, volume_key, _df_ticker_price, _df_ticker_volume):
+    """Builds the technical analysis figure and Gemini context. Cached as a resource (the figure
+    is a mutable object) and keyed on the series fingerprints, so unrelated reruns reuse it."""
+    df_ticker_price, df_ticker_volume = _df_ticker_price, _df_ticker_volume
+
     # Create figure with subplots
     fig = make_subplots(rows=4, cols=1, shared_xaxes=True,
                        vertical_spacing=0.03,
                        row_heights=[0.5, 0.1, 0.2, 0.2]) # Adjust heights as needed
 
+    # All indicators come from one cached lookup (unchanged ticker -> no recomputation on rerun)
+    inds = compute_indicators(ticker, df_ticker_price)
+
     # 1. Candlestick with Bollinger Bands and MAs
-    # Calculate Bollinger Bands
-    upper_band, middle_band, lower_band = calculate_bollinger_bands(df_ticker_price)
-    # Calculate MAs
-    sma50 = calculate_sma(df_ticker_price, 50)
-    sma200 = calculate_sma(df_ticker_price, 200)
+    upper_band, middle_band, lower_band = inds['upper_band'], inds['middle_band'], inds['lower_band']
+    sma50, sma200 = inds['sma50'], inds['sma200']
+
+    # Plotly base64-encodes ndarrays (typed arrays) but takes a slower path for Series,
+    # so share one x array and pass indicator values as float32 ndarrays.
+    x = df_ticker_price.index.values
 
     # Candlestick (Requires OHLC data - get_stock_data needs modification)
     # For now, using line plot of Adj Close
-    fig.add_trace(go.Scatter(x=df_ticker_price.index, y=df_ticker_price, mode='lines', name='Adj Close', line=dict(color='blue')), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df_ticker_price.to_numpy(), mode='lines', name='Adj Close', line=dict(color='blue')), row=1, col=1)
 
     # Bollinger Bands
-    fig.add_trace(go.Scatter(x=upper_band.index, y=upper_band, mode='lines', line=dict(width=1, color='rgba(152,0,0,0.3)'), name='Upper Band'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=middle_band.index, y=middle_band, mode='lines', line=dict(width=1, dash='dash', color='rgba(152,0,0,0.5)'), name=f'SMA {20}'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=lower_band.index, y=lower_band, mode='lines', line=dict(width=1, color='rgba(152,0,0,0.3)'), name='Lower Band', fill='tonexty', fillcolor='rgba(152,0,0,0.1)'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(upper_band), mode='lines', line=dict(width=1, color='rgba(152,0,0,0.3)'), name='Upper Band'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(middle_band), mode='lines', line=dict(width=1, dash='dash', color='rgba(152,0,0,0.5)'), name=f'SMA {20}'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(lower_band), mode='lines', line=dict(width=1, color='rgba(152,0,0,0.3)'), name='Lower Band', fill='tonexty', fillcolor='rgba(152,0,0,0.1)'), row=1, col=1)
 
     # Moving Averages
-    fig.add_trace(go.Scatter(x=sma50.index, y=sma50, mode='lines', name='SMA 50', line=dict(color='orange')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=sma200.index, y=sma200, mode='lines', name='SMA 200', line=dict(color='purple')), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(sma50), mode='lines', name='SMA 50', line=dict(color='orange')), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(sma200), mode='lines', name='SMA 200', line=dict(color='purple')), row=1, col=1)
 
     # 2. Volume
     if not df_ticker_volume.empty:
-         fig.add_trace(go.Bar(x=df_ticker_volume.index, y=df_ticker_volume, name='Volume', marker_color='grey'), row=2, col=1)
+         fig.add_trace(go.Bar(x=df_ticker_volume.index.values, y=df_ticker_volume.to_numpy(), name='Volume', marker_color='grey'), row=2, col=1)
 
     # 3. RSI
-    rsi = calculate_rsi(df_ticker_price)
-    fig.add_trace(go.Scatter(x=rsi.index, y=rsi, mode='lines', name='RSI', line=dict(color='green')), row=3, col=1)
+    rsi = inds['rsi']
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(rsi), mode='lines', name='RSI', line=dict(color='green')), row=3, col=1)
     fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
     fig.add_hline(y=30, line_dash="dash", line_color="blue", row=3, col=1)
 
     # 4. MACD
-    macd_line, signal_line, histogram = calculate_macd(df_ticker_price)
-    fig.add_trace(go.Scatter(x=macd_line.index, y=macd_line, mode='lines', name='MACD Line', line=dict(color='black')), row=4, col=1)
-    fig.add_trace(go.Scatter(x=signal_line.index, y=signal_line, mode='lines', name='Signal Line', line=dict(color='red')), row=4, col=1)
+    macd_line, signal_line, histogram = inds['macd_line'], inds['signal_line'], inds['histogram']
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(macd_line), mode='lines', name='MACD Line', line=dict(color='black')), row=4, col=1)
+    fig.add_trace(go.Scatter(x=x, y=_to_f32(signal_line), mode='lines', name='Signal Line', line=dict(color='red')), row=4, col=1)
     # Color histogram bars based on positive/negative
-    colors = ['green' if val >= 0 else 'red' for val in histogram]
-    fig.add_trace(go.Bar(x=histogram.index, y=histogram, name='MACD Hist', marker_color=colors), row=4, col=1)
+    hist_values = _to_f32(histogram)
+    colors = np.where(hist_values >= 0, 'green', 'red')
+    fig.add_trace(go.Bar(x=x, y=hist_values, name='MACD Hist', marker_color=colors), row=4, col=1)
     fig.add_hline(y=0, line_dash="solid", line_color="grey", row=4, col=1)
 
 
@@ -106,15 +162,21 @@ def plot_technical_analysis(ticker, df_ticker_price, df_ticker_volume):
 
 
     # --- Prepare context for Gemini ---
-    # Get latest values
-    latest_price = df_ticker_price.iloc[-1] if not df_ticker_price.empty else 'N/A'
-    latest_rsi = rsi.iloc[-1] if not rsi.empty else 'N/A'
-    latest_macd = macd_line.iloc[-1] if not macd_line.empty else 'N/A'
-    latest_signal = signal_line.iloc[-1] if not signal_line.empty else 'N/A'
-    latest_upper = upper_band.iloc[-1] if not upper_band.empty else 'N/A'
-    latest_lower = lower_band.iloc[-1] if not lower_band.empty else 'N/A'
-    latest_sma50 = sma50.iloc[-1] if not sma50.empty else 'N/A'
-    latest_sma200 = sma200.iloc[-1] if not sma200.empty else 'N/A'
+    # Get latest values: one positional lookup on a combined frame instead of one per Series
+    # (the price is non-empty here, and all indicators share its index)
+    last_two = pd.concat({'price': df_ticker_price, 'sma50': sma50, 'sma200': sma200,
+                          'upper': upper_band, 'lower': lower_band, 'rsi': rsi,
+                          'macd': macd_line, 'signal': signal_line, 'hist': histogram},
+                         axis=1).iloc[-2:]
+    tail, prev = last_two.iloc[-1], last_two.iloc[0]
+    latest_price = tail['price']
+    latest_rsi = tail['rsi']
+    latest_macd = tail['macd']
+    latest_signal = tail['signal']
+    latest_upper = tail['upper']
+    latest_lower = tail['lower']
+    latest_sma50 = tail['sma50']
+    latest_sma200 = tail['sma200']
 
     technical_context = f"""
     Technical Indicators for {ticker} (Latest Values):
@@ -125,11 +187,11 @@ def plot_technical_analysis(ticker, df_ticker_price, df_ticker_volume):
     RSI(14): {latest_rsi:.2f}
     MACD Line: {latest_macd:.4f}
     Signal Line: {latest_signal:.4f}
-    MACD Histogram: {histogram.iloc[-1]:.4f}
+    MACD Histogram: {tail['hist']:.4f}
     Volume (latest): {df_ticker_volume.iloc[-1] if not df_ticker_volume.empty else 'N/A'}
 
     Price relative to MAs: {'Above SMA50' if latest_price > latest_sma50 else 'Below SMA50'}, {'Above SMA200' if latest_price > latest_sma200 else 'Below SMA200'}
-    Price relative to Bollinger Bands: {'Near Upper' if latest_price > upper_band.iloc[-2] else ('Near Lower' if latest_price < lower_band.iloc[-2] else 'Mid-Band')}
+    Price relative to Bollinger Bands: {'Near Upper' if latest_price > prev['upper'] else ('Near Lower' if latest_price < prev['lower'] else 'Mid-Band')}
     RSI Level: {'Overbought (>70)' if latest_rsi > 70 else ('Oversold (<30)' if latest_rsi < 30 else 'Neutral')}
     MACD Signal: {'Bullish Crossover (MACD > Signal)' if latest_macd > latest_signal else ('Bearish Crossover (MACD < Signal)' if latest_macd < latest_signal else 'Neutral')}
     """
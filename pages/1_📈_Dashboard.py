@@ -25,9 +25,8 @@ def show():
         # context = fetch_latest_market_news() # Hypothetical function
         context = "Context: S&P 500 is slightly down, Nasdaq is flat, VIX is low." # Example simple context
         if st.button("Get Market Outlook from Gemini"):
-             from utils.gemini_analyzer import get_gemini_analysis # Import here to avoid circular deps if needed
-             analysis = get_gemini_analysis(prompt, context)
-             st.markdown(analysis)
+             from utils.gemini_analyzer import stream_gemini_analysis # Import here to avoid circular deps if needed
+             stream_gemini_analysis(prompt, context) # Renders the answer as it streams in
     else:
         st.warning("Configure Gemini API Key in Settings to enable AI insights.")
 
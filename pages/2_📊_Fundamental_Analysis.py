@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-from utils.data_fetcher import get_stock_info, get_recommendations, get_earnings_history
+from utils.data_fetcher import get_stock_info_batch, get_recommendations, get_earnings_history
 from components.fundamental_metrics import display_fundamental_metrics, display_recommendations, display_earnings_history
-from utils.gemini_analyzer import get_gemini_analysis
+from utils.gemini_analyzer import stream_gemini_analysis
 
 def show():
     st.title("📊 Fundamental Analysis")
@@ -16,37 +16,53 @@ def show():
     if selected_ticker:
         st.header(f"Analysis for: {selected_ticker}")
 
-        # Fetch Data
-        info = get_stock_info(selected_ticker)
-        recommendations = get_recommendations(selected_ticker)
-        earnings = get_earnings_history(selected_ticker)
+        # Fetch Data - one batched (and cached) call covers every sidebar ticker,
+        # so switching the selectbox afterwards needs no network round-trip
+        info = get_stock_info_batch(tuple(st.session_state.tickers)).get(selected_ticker)
+        if info is None: # Only the selected ticker is reported, not every sidebar symbol
+            st.warning(f"Could not retrieve complete or accurate info for {selected_ticker}. Ticker might be invalid, delisted, or data unavailable.", icon="⚠️")
 
         # Display Metrics
         fundamental_context = display_fundamental_metrics(selected_ticker, info)
-        display_recommendations(selected_ticker, recommendations)
-        display_earnings_history(selected_ticker, earnings)
+
+        # Recommendations and earnings are separate yfinance calls; only fetch them on request.
+        # (An expander alone would not help: its body runs even while collapsed.)
+        if st.toggle("Show analyst recommendations", key="fa_show_recommendations"):
+            display_recommendations(selected_ticker, get_recommendations(selected_ticker))
+        if st.toggle("Show earnings history", key="fa_show_earnings"):
+            display_earnings_history(selected_ticker, get_earnings_history(selected_ticker))
 
         # --- Gemini AI Analysis Panel ---
-        st.sidebar.markdown("---")
-        st.sidebar.subheader("🤖 Gemini AI Analysis")
-        if st.session_state.get('gemini_api_key') and st.session_state.get('gemini_model'):
-             prompt_options = [
-                 f"Analyze the key fundamental metrics for {selected_ticker}. Is it potentially overvalued or undervalued based on these metrics? What are the main risks and strengths?",
-                 f"Summarize the business model and competitive position of {selected_ticker} based on its summary.",
-                 f"What do the recent analyst recommendations suggest for {selected_ticker}?",
-                 f"Explain the earnings history trend for {selected_ticker}."
-             ]
-             chosen_prompt = st.sidebar.selectbox("Select an analysis prompt:", prompt_options, key="fa_gemini_prompt")
-
-             if st.sidebar.button("Ask Gemini", key="fa_gemini_button"):
-                 # Combine context from displayed data
-                 full_context = f"{fundamental_context}\n\nRecommendations Summary:\n{recommendations.head().to_string() if recommendations is not None else 'N/A'}\n\nEarnings Summary:\n{earnings.head().to_string() if earnings is not None else 'N/A'}"
-                 analysis = get_gemini_analysis(chosen_prompt, full_context)
-                 # Display analysis in a dedicated expander or area
-                 with st.expander("💡 Gemini AI Insights", expanded=True):
-                      st.markdown(analysis)
-        else:
-             st.sidebar.warning("Configure Gemini API Key in Settings to enable AI analysis.")
+        # Fragments cannot call st.sidebar directly, so the fragment is placed inside it
+        with st.sidebar:
+            _gemini_panel(selected_ticker, fundamental_context)
+
+
+@st.fragment
+def _gemini_panel(ticker, fundamental_context):
+    """Gemini sidebar panel; interacting with it reruns only this fragment, not the whole page."""
+    st.markdown("---")
+    st.subheader("🤖 Gemini AI Analysis")
+    if st.session_state.get('gemini_api_key') and st.session_state.get('gemini_model'):
+         prompt_options = [
+             f"Analyze the key fundamental metrics for {ticker}. Is it potentially overvalued or undervalued based on these metrics? What are the main risks and strengths?",
+             f"Summarize the business model and competitive position of {ticker} based on its summary.",
+             f"What do the recent analyst recommendations suggest for {ticker}?",
+             f"Explain the earnings history trend for {ticker}."
+         ]
+         chosen_prompt = st.selectbox("Select an analysis prompt:", prompt_options, key="fa_gemini_prompt")
+
+         if st.button("Ask Gemini", key="fa_gemini_button"):
+             # Fetched only now (and cached), since the page may not have loaded them
+             recommendations = get_recommendations(ticker)
+             earnings = get_earnings_history(ticker)
+             # Combine context from displayed data
+             full_context = f"{fundamental_context}\n\nRecommendations Summary:\n{recommendations.head().to_string() if recommendations is not None else 'N/A'}\n\nEarnings Summary:\n{earnings.head().to_string() if earnings is not None else 'N/A'}"
+             # Display analysis in a dedicated expander or area, streamed as it arrives
+             with st.expander("💡 Gemini AI Insights", expanded=True):
+                  stream_gemini_analysis(chosen_prompt, full_context)
+    else:
+         st.warning("Configure Gemini API Key in Settings to enable AI analysis.")
 
 
 # Run the show function if the script is executed directly
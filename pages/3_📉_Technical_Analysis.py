@@ -3,9 +3,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np # Make sure numpy is imported
 from utils.data_fetcher import get_stock_data
-from components.technical_charts import plot_technical_analysis
-from utils.statistics_utils import calculate_returns, calculate_statistics, plot_return_distribution, calculate_sharpe_ratio
-from utils.gemini_analyzer import get_gemini_analysis
+from utils.gemini_analyzer import stream_gemini_analysis
 
 def show():
     st.title("📉 Technical Analysis & Statistics")
@@ -21,7 +19,8 @@ def show():
         end_date = st.session_state.end_date
 
         # Fetch Data - get_stock_data returns a DataFrame with tickers as columns
-        adj_close_df = get_stock_data([selected_ticker], start_date, end_date) # Pass ticker as list
+        # Shared cache_resource object: read-only here, never modified in place
+        adj_close_df = get_stock_data([selected_ticker], start_date, end_date)
 
         # Check if data fetching was successful and the specific ticker column exists
         if adj_close_df.empty or selected_ticker not in adj_close_df.columns:
@@ -41,10 +40,13 @@ def show():
             # --- Placeholder Volume Simulation ---
             # IMPORTANT: Replace this if you modify get_stock_data to fetch actual Volume
             st.caption("Note: Volume data is simulated for this chart.")
-            np.random.seed(42) # for reproducibility
-            sim_vol = 1_000_000 + 500_000 * np.random.randn(len(df_ticker_price))
-            sim_vol[sim_vol < 0] = 0 # Volume cannot be negative
-            df_ticker_volume = pd.Series(sim_vol, index=df_ticker_price.index, name='Volume')
+            rng = np.random.default_rng(42) # for reproducibility (PCG64, faster than the legacy global RNG)
+            # float32 end to end: half the bytes of float64, in-place scale/shift and clip
+            sim_vol = rng.standard_normal(len(df_ticker_price), dtype=np.float32)
+            sim_vol *= 500_000
+            sim_vol += 1_000_000
+            np.maximum(sim_vol, 0.0, out=sim_vol) # Volume cannot be negative
+            df_ticker_volume = pd.Series(sim_vol, index=df_ticker_price.index, name='Volume', copy=False)
             # --- End Placeholder ---
 
             # If you fetch real volume:
@@ -63,48 +65,47 @@ def show():
 
         # --- Technical Chart ---
         st.header(f"Technical Chart: {selected_ticker}")
-        if df_ticker_price.isnull().all():
+        price_clean = df_ticker_price.dropna() # Drop NaNs once; reused for the chart and the returns
+        if price_clean.empty:
              st.warning(f"Price data for {selected_ticker} contains only NaN values. Cannot plot chart.")
         else:
-             fig_tech, technical_context = plot_technical_analysis(selected_ticker, df_ticker_price.dropna(), df_ticker_volume.reindex(df_ticker_price.dropna().index)) # Pass Series, drop NaNs for plotting robustness, align volume index
+             from components.technical_charts import plot_technical_analysis # Deferred: plotly loads only when a chart is drawn
+             fig_tech, technical_context = plot_technical_analysis(selected_ticker, price_clean, df_ticker_volume.reindex(price_clean.index)) # Align volume index with the cleaned prices
              st.plotly_chart(fig_tech, use_container_width=True)
 
         # --- Statistics & Distribution ---
         st.header(f"Return Statistics & Distribution: {selected_ticker}")
-        returns = calculate_returns(df_ticker_price) # Use original series with NaNs kept for returns calc
-
-        if not returns.empty and not returns.isnull().all():
-            # Drop NaNs from returns before calculating stats
-            returns_cleaned = returns.dropna()
-            if not returns_cleaned.empty:
-                stats = calculate_statistics(returns_cleaned)
-                sharpe = calculate_sharpe_ratio(returns_cleaned, st.session_state.risk_free_rate)
-                stats['Sharpe Ratio (Ann)'] = sharpe
-
-                st.subheader("Key Statistics")
-                # ... (rest of the statistics display code) ...
-                cols = st.columns(4)
-                cols[0].metric("Annualized Return", f"{stats.get('Mean Return (Ann)', 0):.2%}")
-                cols[1].metric("Annualized Volatility", f"{stats.get('Volatility (Ann)', 0):.2%}")
-                cols[2].metric("Sharpe Ratio", f"{stats.get('Sharpe Ratio (Ann)', 0):.2f}")
-                cols[3].metric("Skewness", f"{stats.get('Skewness', 0):.2f}")
-
-                st.subheader("Return Distribution (Bell Curve)")
-                fig_dist = plot_return_distribution(returns_cleaned, selected_ticker)
-                st.plotly_chart(fig_dist, use_container_width=True)
-
-                stats_context = f"""
-                Return Statistics for {selected_ticker} (based on {len(returns_cleaned)} data points):
-                Annualized Mean Return: {stats.get('Mean Return (Ann)', 0):.2%}
-                Annualized Volatility: {stats.get('Volatility (Ann)', 0):.2%}
-                Sharpe Ratio: {stats.get('Sharpe Ratio (Ann)', 0):.2f}
-                Skewness: {stats.get('Skewness', 0):.2f}
-                Kurtosis: {stats.get('Kurtosis', 0):.2f}
-                """
-            else:
-                 st.warning("Not enough valid data points after dropping NaNs to calculate statistics.")
-                 stats_context = "Not enough valid data for statistical analysis."
-
+        # Daily simple returns straight from the cleaned prices as an ndarray (no pandas alignment)
+        px = price_clean.to_numpy(dtype=np.float64)
+        returns_np = px[1:] / px[:-1] - 1.0
+
+        if returns_np.size > 0:
+            from utils.statistics_utils import calculate_statistics, plot_return_distribution, calculate_sharpe_ratio # Deferred scipy/plotly import
+            stats = calculate_statistics(returns_np)
+            sharpe = calculate_sharpe_ratio(returns_np, st.session_state.risk_free_rate,
+                                            mean=stats['Mean Return (Daily)'], std=stats['Std Dev (Daily)']) # Reuse the fused moments
+            stats['Sharpe Ratio (Ann)'] = sharpe
+
+            st.subheader("Key Statistics")
+            # ... (rest of the statistics display code) ...
+            cols = st.columns(4)
+            cols[0].metric("Annualized Return", f"{stats.get('Mean Return (Ann)', 0):.2%}")
+            cols[1].metric("Annualized Volatility", f"{stats.get('Volatility (Ann)', 0):.2%}")
+            cols[2].metric("Sharpe Ratio", f"{stats.get('Sharpe Ratio (Ann)', 0):.2f}")
+            cols[3].metric("Skewness", f"{stats.get('Skewness', 0):.2f}")
+
+            st.subheader("Return Distribution (Bell Curve)")
+            fig_dist = plot_return_distribution(returns_np, selected_ticker)
+            st.plotly_chart(fig_dist, use_container_width=True)
+
+            stats_context = f"""
+            Return Statistics for {selected_ticker} (based on {len(returns_np)} data points):
+            Annualized Mean Return: {stats.get('Mean Return (Ann)', 0):.2%}
+            Annualized Volatility: {stats.get('Volatility (Ann)', 0):.2%}
+            Sharpe Ratio: {stats.get('Sharpe Ratio (Ann)', 0):.2f}
+            Skewness: {stats.get('Skewness', 0):.2f}
+            Kurtosis: {stats.get('Kurtosis', 0):.2f}
+            """
         else:
             st.warning("Not enough data points or only NaN values to calculate returns and statistics.")
             stats_context = "Not enough data for statistical analysis."
@@ -124,9 +125,8 @@ def show():
              if st.sidebar.button("Ask Gemini", key="ta_gemini_button"):
                  # Combine context from technical chart and stats
                  full_context = f"{technical_context}\n\n{stats_context}"
-                 analysis = get_gemini_analysis(chosen_prompt, full_context)
                  with st.expander("💡 Gemini AI Insights", expanded=True):
-                      st.markdown(analysis)
+                      stream_gemini_analysis(chosen_prompt, full_context) # Renders the answer as it streams in
         else:
              st.sidebar.warning("Configure Gemini API Key in Settings to enable AI analysis.")
 
@@ -2,14 +2,25 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from components.stock_selector import render_portfolio_selector
-from utils.data_fetcher import get_stock_data
-from utils.statistics_utils import calculate_returns
-from utils.portfolio_optimizer import (calculate_portfolio_performance,
-                                       generate_efficient_frontier,
-                                       find_optimal_portfolio)
-from utils.bootstrap_simulator import run_bootstrap_simulation, plot_simulation_histogram
-from components.portfolio_charts import plot_efficient_frontier, display_portfolio_summary
-from utils.gemini_analyzer import get_gemini_analysis
+from utils.data_fetcher import fetch_prices_parallel
+from utils.sim_stats import summarize
+from utils.gemini_analyzer import stream_gemini_analysis
+
+def _hash_frame(df):
+    """Fast DataFrame hash for st.cache_data (Streamlit's default hashing is slow on large frames)."""
+    return pd.util.hash_pandas_object(df, index=True).values.tobytes() + str(tuple(df.columns)).encode()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_prices(tickers_tuple, start, end):
+    """Widget-driven reruns with unchanged tickers/dates hit memory instead of yfinance."""
+    return fetch_prices_parallel(list(tickers_tuple), start, end, max_workers=8)
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _hash_frame})
+def _prep_returns(prices):
+    """Daily returns, mean returns and covariance; unchanged when only the sliders move."""
+    from utils.statistics_utils import calculate_returns # Pulls in scipy.stats and numba
+    returns = calculate_returns(prices)
+    return returns, returns.mean(), returns.cov()
 
 def show():
     st.title("💼 Portfolio Optimization (Modern Portfolio Theory)")
@@ -21,31 +32,34 @@ def show():
         st.info("Please select at least two stocks for portfolio optimization.")
         return
 
+    # Deferred imports: scipy, numba and plotly load only once a page actually needs them
+    from utils.portfolio_optimizer import generate_efficient_frontier
+    from utils.bootstrap_simulator import run_bootstrap_simulation, plot_simulation_histogram
+    from components.portfolio_charts import plot_efficient_frontier, display_portfolio_summary
+
     start_date = st.session_state.start_date
     end_date = st.session_state.end_date
     risk_free_rate = st.session_state.risk_free_rate
 
     # --- Fetch Data ---
-    data = get_stock_data(portfolio_tickers, start_date, end_date)
+    data, failed = _cached_prices(tuple(sorted(portfolio_tickers)), start_date, end_date)
 
-    if data.empty or data.isnull().values.any():
-        st.error("Could not fetch valid data for all selected portfolio tickers. Check symbols or date range.")
-        # Optionally display which tickers failed if data_fetcher provides more info
+    if failed or data.empty:
+        failed_str = f" Failed: {', '.join(failed)}." if failed else ""
+        st.error(f"Could not fetch valid data for all selected portfolio tickers. Check symbols or date range.{failed_str}")
         return
+    data = data.ffill().bfill() # Fill gaps such as exchange-specific holidays instead of rejecting the data
 
     # --- Calculate Returns & Covariance ---
-    returns = calculate_returns(data)
+    returns, mean_returns, cov_matrix = _prep_returns(data)
     if returns.empty or returns.shape[0] < 2: # Need at least 2 data points for covariance
          st.error("Not enough historical data in the selected range to perform optimization.")
          return
 
-    mean_returns = returns.mean()
-    cov_matrix = returns.cov()
-
     # --- Optimization Setup ---
     num_assets = len(portfolio_tickers)
     # Constraints: sum of weights = 1
-    constraints = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1})
+    constraints = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones_like(w)}) # Analytic constraint gradient for SLSQP
     # Bounds: weights between 0 and 1 (no short selling)
     bounds = tuple((0.0, 1.0) for _ in range(num_assets))
 
@@ -93,16 +107,19 @@ def show():
 
             simulated_end_values, fig_sim_dist = run_bootstrap_simulation(returns, weights_for_sim, num_simulations=num_sims, sim_years=sim_years)
 
-            if simulated_end_values:
-                fig_sim_hist = plot_simulation_histogram(simulated_end_values, num_sims, sim_years)
+            if len(simulated_end_values) > 0:
+                # Calculate summary stats of simulation once; the chart annotations reuse them
+                final_returns_pct = (np.asarray(simulated_end_values) - 1.0) * 100.0 # Vectorized; no per-value Python loop
+                sim_summary = summarize(final_returns_pct) # One partition for all four
+                fig_sim_hist = plot_simulation_histogram(simulated_end_values, num_sims, sim_years, summary=sim_summary)
                 st.plotly_chart(fig_sim_hist, use_container_width=True)
                 # st.plotly_chart(fig_sim_dist, use_container_width=True) # Optional: Show daily return distribution
-                # Calculate and display summary stats of simulation
-                final_returns_pct = [(val - 1) * 100 for val in simulated_end_values]
-                st.metric("Mean Simulated Return", f"{np.mean(final_returns_pct):.2f}%")
-                st.metric("Median Simulated Return", f"{np.median(final_returns_pct):.2f}%")
-                st.metric("5th Percentile Return", f"{np.percentile(final_returns_pct, 5):.2f}%")
-                st.metric("95th Percentile Return", f"{np.percentile(final_returns_pct, 95):.2f}%")
+                # Display summary stats of simulation
+                mean_ret, median_ret, p5_ret, p95_ret = sim_summary
+                st.metric("Mean Simulated Return", f"{mean_ret:.2f}%")
+                st.metric("Median Simulated Return", f"{median_ret:.2f}%")
+                st.metric("5th Percentile Return", f"{p5_ret:.2f}%")
+                st.metric("95th Percentile Return", f"{p95_ret:.2f}%")
             else:
                 st.warning("Simulation could not be completed.")
 
@@ -127,9 +144,8 @@ def show():
                  # if 'final_returns_pct' in locals():
                  #     full_context += f"\n\nBootstrap Simulation ({selected_portfolio_for_sim}) Summary:\nMean Return: {np.mean(final_returns_pct):.2f}%, Median: {np.median(final_returns_pct):.2f}%, 5th Perc: {np.percentile(final_returns_pct, 5):.2f}%, 95th Perc: {np.percentile(final_returns_pct, 95):.2f}%"
 
-                 analysis = get_gemini_analysis(chosen_prompt, full_context)
                  with st.expander("💡 Gemini AI Insights", expanded=True):
-                      st.markdown(analysis)
+                      stream_gemini_analysis(chosen_prompt, full_context) # Renders the answer as it streams in
         else:
              st.sidebar.warning("Configure Gemini API Key in Settings to enable AI analysis.")
 
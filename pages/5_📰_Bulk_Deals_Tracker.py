@@ -1,7 +1,7 @@
 import streamlit as st
 from utils.bulk_deals_scraper import get_bulk_deals_data # Placeholder
 from components.bulk_deals_table import display_bulk_deals # Placeholder display
-from utils.gemini_analyzer import get_gemini_analysis
+from utils.gemini_analyzer import stream_gemini_analysis
 
 def show():
     st.title("📰 Bulk & Block Deals Tracker")
@@ -26,9 +26,8 @@ def show():
          chosen_prompt = st.sidebar.selectbox("Select an analysis prompt:", prompt_options, key="bd_gemini_prompt")
 
          if st.sidebar.button("Ask Gemini", key="bd_gemini_button"):
-             analysis = get_gemini_analysis(chosen_prompt, deals_context)
              with st.expander("💡 Gemini AI Insights", expanded=True):
-                  st.markdown(analysis)
+                  stream_gemini_analysis(chosen_prompt, deals_context) # Renders the answer as it streams in
     elif not deals_context:
          st.sidebar.info("No deal data to analyze.")
     else:
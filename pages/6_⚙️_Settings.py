@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.gemini_analyzer import configure_gemini # Import the configuration function
+from utils.tickers import parse_tickers
 
 def show():
     st.title("⚙️ Settings & Preferences")
@@ -15,18 +16,13 @@ def show():
         help="Get your key from Google AI Studio: https://aistudio.google.com/app/apikey"
     )
     if gemini_key_input:
-        st.session_state['gemini_api_key'] = gemini_key_input
-        # Attempt to configure Gemini immediately when the key is entered/changed
-        try:
-            st.session_state['gemini_model'] = configure_gemini(st.session_state['gemini_api_key'])
+        # Configure only when the key is entered/changed (or no model yet), not on every rerun.
+        # configure_gemini is cached per key and handles its own errors.
+        if gemini_key_input != st.session_state.get('gemini_api_key') or st.session_state.get('gemini_model') is None:
+            st.session_state['gemini_api_key'] = gemini_key_input
+            st.session_state['gemini_model'] = configure_gemini(gemini_key_input)
             if st.session_state['gemini_model']:
                 st.success("Gemini API Key configured successfully.")
-            else:
-                # Error message is handled within configure_gemini
-                pass
-        except Exception as e:
-            st.error(f"Failed to configure Gemini: {e}")
-            st.session_state['gemini_model'] = None
     elif st.session_state.get('gemini_api_key'):
          # If key exists in session state but input is cleared, clear the model too
          st.session_state['gemini_api_key'] = None
@@ -73,9 +69,9 @@ def show():
         key="settings_analysis_tickers"
     )
     if st.button("Update Analysis Tickers", key="update_analysis"):
-        st.session_state['tickers'] = [ticker.strip().upper() for ticker in analysis_tickers_str.split(',') if ticker.strip()]
+        # The button click already triggered this rerun; other pages read the new list on their next run
+        st.session_state['tickers'] = list(parse_tickers(analysis_tickers_str))
         st.success("Analysis tickers updated.")
-        st.rerun() # Rerun to reflect changes immediately
 
     st.subheader("Current Portfolio Tickers")
     portfolio_tickers_str = st.text_area(
@@ -84,9 +80,8 @@ def show():
         key="settings_portfolio_tickers"
     )
     if st.button("Update Portfolio Tickers", key="update_portfolio"):
-        st.session_state['portfolio_tickers'] = [ticker.strip().upper() for ticker in portfolio_tickers_str.split(',') if ticker.strip()]
+        st.session_state['portfolio_tickers'] = list(parse_tickers(portfolio_tickers_str))
         st.success("Portfolio tickers updated.")
-        st.rerun() # Rerun to reflect changes immediately
 
     # Add options for saving/loading settings locally if needed (more complex)
 
@@ -1,5 +1,6 @@
 import streamlit as st
 from datetime import datetime, timedelta
+from utils.tickers import parse_tickers
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -15,20 +16,18 @@ st.caption("Powered by yfinance, MPT, Bootstrapping, TA/FA & Gemini AI")
 
 # --- Initialize Session State ---
 # Use session state to store user inputs and selections across pages
-if 'tickers' not in st.session_state:
-    st.session_state.tickers = [] # Default or example tickers ['AAPL', 'MSFT', 'GOOGL']
-if 'start_date' not in st.session_state:
-    st.session_state.start_date = datetime.now().date() - timedelta(days=365 * 2)
-if 'end_date' not in st.session_state:
-    st.session_state.end_date = datetime.now().date()
-if 'portfolio_tickers' not in st.session_state:
-    st.session_state.portfolio_tickers = []
-if 'risk_free_rate' not in st.session_state:
-    st.session_state.risk_free_rate = 0.02 # Default 2%
-if 'gemini_api_key' not in st.session_state:
-    st.session_state.gemini_api_key = None
-if 'gemini_model' not in st.session_state:
-    st.session_state.gemini_model = None # Will be initialized in settings/gemini_analyzer
+_today = datetime.now().date() # Read the clock once for both date defaults
+_DEFAULTS = {
+    'tickers': [], # Default or example tickers ['AAPL', 'MSFT', 'GOOGL']
+    'start_date': _today - timedelta(days=365 * 2),
+    'end_date': _today,
+    'portfolio_tickers': [],
+    'risk_free_rate': 0.02, # Default 2%
+    'gemini_api_key': None,
+    'gemini_model': None, # Will be initialized in settings/gemini_analyzer
+}
+for _key, _value in _DEFAULTS.items():
+    st.session_state.setdefault(_key, _value)
 
 # --- Sidebar Introduction ---
 st.sidebar.success("Select an analysis page above.")
@@ -53,7 +52,7 @@ tickers_input = st.sidebar.text_input("Enter Stock Tickers (comma-separated)",
                                       value=", ".join(st.session_state.tickers),
                                       key="sidebar_ticker_input")
 if tickers_input:
-    st.session_state.tickers = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
+    st.session_state.tickers = list(parse_tickers(tickers_input))
 
 # --- Global Date Range Input ---
 st.sidebar.subheader("Select Date Range")
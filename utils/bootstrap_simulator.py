@@ -1,10 +1,64 @@
+import threading
 import numpy as np
 import pandas as pd
-from sklearn.utils import resample
 import plotly.graph_objects as go
-from .portfolio_optimizer import calculate_portfolio_performance # Import from sibling
+from .jit import njit, prange, NUMBA_AVAILABLE
+from .sim_stats import summarize
 
-def run_bootstrap_simulation(returns_df, weights, num_simulations=1000, sim_years=1):
+_HIST_BINS = 50
+# Streamlit runs each session on its own thread, and Numba's default workqueue threading
+# layer aborts the process on concurrent parallel calls; the kernel already uses every core
+_KERNEL_LOCK = threading.Lock()
+
+def _histogram_edges(portfolio_daily):
+    """Fixed bin edges for the simulated daily returns; every sample is one of portfolio_daily's values."""
+    return np.linspace(portfolio_daily.min(), portfolio_daily.max(), _HIST_BINS + 1)
+
+def _day_bins(portfolio_daily, edges):
+    """Bin index of each historical daily return (last bin closed, as in np.histogram)."""
+    return np.clip(np.searchsorted(edges, portfolio_daily, side='right') - 1, 0, _HIST_BINS - 1)
+
+def _binned_counts(idx, day_bins, num_days):
+    """
+    Histogram counts of the sampled daily returns without materializing the samples.
+
+    Each sample is a historical day, so counting how often each day was drawn and summing
+    those counts per bin gives the same result as np.histogram over the sampled values.
+    """
+    day_draws = np.bincount(idx.ravel(), minlength=num_days)
+    return np.bincount(day_bins, weights=day_draws, minlength=_HIST_BINS).astype(np.int64)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _bootstrap_kernel(log_daily, day_bins, n_bins, n_sims, sim_days, seed):
+    """
+    Draws and compounds every path in compiled code, without an index or sample matrix.
+
+    Args:
+        log_daily (np.ndarray): log1p of the daily portfolio returns (float64).
+        day_bins (np.ndarray): Histogram bin index of each daily return.
+        n_bins (int): Number of histogram bins.
+        n_sims (int): Number of paths.
+        sim_days (int): Days per path.
+        seed (int): Base seed; path i draws from its own stream seeded with seed + i.
+
+    Returns:
+        tuple: (end_values, counts) - ending value of each path and per-path bin counts
+               (n_sims, n_bins) of the drawn daily returns.
+    """
+    num_days = len(log_daily)
+    end_values = np.empty(n_sims)
+    counts = np.zeros((n_sims, n_bins), dtype=np.int64) # Per path, so parallel iterations never share a row
+    for i in prange(n_sims):
+        np.random.seed(seed + i) # Numba keeps one random state per thread
+        s = 0.0
+        for _ in range(sim_days):
+            d = np.random.randint(0, num_days)
+            s += log_daily[d]
+            counts[i, day_bins[d]] += 1
+        end_values[i] = np.exp(s)
+    return end_values, counts
+
+def run_bootstrap_simulation(returns_df, weights, num_simulations=1000, sim_years=1, seed=None):
     """
     Performs bootstrap simulation on portfolio returns.
 
@@ -13,31 +67,50 @@ def run_bootstrap_simulation(returns_df, weights, num_simulations=1000, sim_year
         weights (np.array): Portfolio weights.
         num_simulations (int): Number of bootstrap simulations to run.
         sim_years (int): Number of years to simulate forward for each path.
+        seed (int, optional): Seed for reproducible paths; None draws fresh entropy.
 
     Returns:
-        list: A list of simulated portfolio ending values (or total returns).
+        np.ndarray: Simulated portfolio ending values (starting value of 1), one per path.
         go.Figure: A Plotly figure showing the distribution of outcomes.
     """
     if returns_df.empty or len(weights) != returns_df.shape[1]:
-        return [], go.Figure()
+        return np.array([]), go.Figure()
 
     sim_days = int(sim_years * 252) # Trading days per year
-    simulated_end_values = []
-    all_sim_returns = []
-
-    for _ in range(num_simulations):
-        # Bootstrap sampling of daily returns
-        bootstrap_sample = resample(returns_df, n_samples=sim_days, replace=True)
-
-        # Calculate portfolio return for this simulated path
-        # Assuming starting value of 1, calculate cumulative return
-        compounded_return = (1 + bootstrap_sample.dot(weights)).prod()
-        simulated_end_values.append(compounded_return)
-        all_sim_returns.extend(bootstrap_sample.dot(weights).tolist()) # Collect daily returns for distribution plot
+    # Apply the weights before resampling: bootstrapping whole days and then taking the
+    # dot product equals resampling the daily portfolio returns, and avoids ever building
+    # a (num_simulations, sim_days, num_assets) array. float32 halves the sample matrix.
+    returns_np = returns_df.values.astype(np.float32)
+    portfolio_daily = returns_np @ np.asarray(weights, dtype=np.float32)
+
+    # Daily returns are pre-binned over fixed edges, so the (num_simulations, sim_days)
+    # sample matrix never has to be built or shipped to the browser for re-binning
+    edges = _histogram_edges(portfolio_daily)
+    if NUMBA_AVAILABLE:
+        # Compiled kernel: threads over paths and keeps memory at O(num_simulations)
+        kernel_seed = int(np.random.SeedSequence(seed).generate_state(1)[0] >> 1)
+        log_daily = np.log1p(portfolio_daily.astype(np.float64))
+        day_bins = _day_bins(portfolio_daily, edges)
+        with _KERNEL_LOCK:
+            simulated_end_values, path_counts = _bootstrap_kernel(log_daily, day_bins, _HIST_BINS,
+                                                                  num_simulations, sim_days, kernel_seed)
+        counts = path_counts.sum(axis=0)
+    else:
+        # Fallback without numba: all paths drawn at once as one index matrix
+        rng = np.random.default_rng(seed)
+        idx = rng.integers(0, len(portfolio_daily), size=(num_simulations, sim_days), dtype=np.int32) # Half the bytes of int64
+
+        # Assuming starting value of 1, compound each path as exp(sum(log1p(r))): a single
+        # streaming reduction that cannot overflow/underflow over long horizons. log1p is
+        # taken on the T daily values once and gathered, rather than on every sampled day.
+        log_daily = np.log1p(portfolio_daily)
+        simulated_end_values = np.exp(log_daily[idx].sum(axis=1, dtype=np.float64))
+        counts = _binned_counts(idx, _day_bins(portfolio_daily, edges), len(portfolio_daily))
 
     # Plot distribution of simulated daily portfolio returns
     fig = go.Figure()
-    fig.add_trace(go.Histogram(x=all_sim_returns, name='Simulated Daily Returns', nbinsx=50))
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name='Simulated Daily Returns'))
+
     fig.update_layout(
         title=f'Distribution of Simulated Daily Portfolio Returns ({num_simulations} paths, {sim_years} year(s))',
         xaxis_title='Simulated Daily Return',
@@ -47,20 +120,24 @@ def run_bootstrap_simulation(returns_df, weights, num_simulations=1000, sim_year
     return simulated_end_values, fig
 
 
-def plot_simulation_histogram(simulated_end_values, num_simulations, sim_years):
-     """Plots a histogram of the final simulated portfolio values."""
-     if not simulated_end_values:
+def plot_simulation_histogram(simulated_end_values, num_simulations, sim_years, summary=None):
+     """
+     Plots a histogram of the final simulated portfolio values.
+
+     summary: optional (mean, median, p5, p95) of the % returns, as from sim_stats.summarize,
+     when the caller has already computed it.
+     """
+     if len(simulated_end_values) == 0:
          return go.Figure()
 
-     final_returns_pct = [(val - 1) * 100 for val in simulated_end_values] # Convert ending value to % return
+     final_returns_pct = (np.asarray(simulated_end_values) - 1.0) * 100.0 # Convert ending value to % return
 
      fig = go.Figure()
      fig.add_trace(go.Histogram(x=final_returns_pct, name='Simulated Outcomes', nbinsx=50))
 
-     mean_outcome = np.mean(final_returns_pct)
-     median_outcome = np.median(final_returns_pct)
-     percentile_5 = np.percentile(final_returns_pct, 5)
-     percentile_95 = np.percentile(final_returns_pct, 95)
+     if summary is None:
+         summary = summarize(final_returns_pct) # One partition for all four
+     mean_outcome, median_outcome, percentile_5, percentile_95 = summary
 
      fig.add_vline(x=mean_outcome, line_dash="dash", line_color="red", annotation_text=f"Mean: {mean_outcome:.2f}%")
      fig.add_vline(x=median_outcome, line_dash="dash", line_color="green", annotation_text=f"Median: {median_outcome:.2f}%")
@@ -1,7 +1,7 @@
 import pandas as pd
 import streamlit as st
 
-@st.cache_data(ttl=1800) # Cache for 30 mins
+@st.cache_data(ttl=900, show_spinner="Fetching bulk deals...") # Cache for 15 mins; reruns reuse the scraped frame
 def get_bulk_deals_data():
     """
     Placeholder function to fetch bulk/block deal data.
@@ -20,6 +20,7 @@ def get_bulk_deals_data():
         'Price': [2300.50, 1400.10, 3450.00]
     }
     df = pd.DataFrame(data)
-    df['Date'] = pd.to_datetime(df['Date']).dt.date
+    df['Date'] = pd.to_datetime(df['Date']).dt.date.astype('date32[pyarrow]') # convert_dtypes leaves date objects as object
     # --- End Sample Data ---
-    return df
\ No newline at end of file
+    # Arrow-backed columns let st.dataframe skip the NumPy -> Arrow conversion on each render
+    return df.convert_dtypes(dtype_backend='pyarrow')
\ No newline at end of file
@@ -1,15 +1,112 @@
 # utils/data_fetcher.py
 
+import glob
+import hashlib
+import os
+from pathlib import Path
 import yfinance as yf
 import pandas as pd
 import streamlit as st
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback # For detailed error logging
+import warnings
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import diskcache # Optional: persists .info across app restarts
+except ImportError:
+    diskcache = None
+
+try:
+    from curl_cffi import requests as curl_requests # What yfinance itself uses for Yahoo
+except ImportError:
+    curl_requests = None
+
+_INFO_CACHE_DIR = '.yf_cache'
+_INFO_DISK_TTL = 24 * 3600 # Seconds
+
+
+def _make_session():
+    """
+    One process-wide HTTP session for every yfinance call, so connections (TCP + TLS)
+    are pooled and reused instead of being opened per Ticker/download.
+    """
+    if curl_requests is not None:
+        return curl_requests.Session(impersonate="chrome") # Pools connections internally
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20,
+                                          max_retries=Retry(total=3, backoff_factor=0.3)))
+    return session
+
+_SESSION = _make_session()
+
+# Owned by the app and anchored to the project, not the CWD, since old days are deleted from it
+_PARQUET_CACHE_DIR = str(Path(__file__).resolve().parent.parent / '.price_cache')
+
+
+def _parquet_cache_path(key, day):
+    """File for a cache key: .price_cache/<day>/<sha1 of the key>.parquet."""
+    name = hashlib.sha1(repr(key).encode()).hexdigest() + '.parquet'
+    return os.path.join(_PARQUET_CACHE_DIR, day, name)
+
+
+def _read_parquet_cache(key, day):
+    """Cached price panel for key (memory-mapped Parquet read), or None if absent/unreadable."""
+    path = _parquet_cache_path(key, day)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pq.read_table(path, use_threads=True, memory_map=True).to_pandas()
+    except Exception:
+        return None # Corrupt/partial file: fall back to downloading
+
+
+def _prune_parquet_cache(day):
+    """
+    Deletes the panels of earlier days; they are never read again. Only date-named
+    directories and the Parquet (and leftover temp) files this module writes are touched.
+    """
+    for entry in os.scandir(_PARQUET_CACHE_DIR):
+        if entry.name == day or not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            datetime.strptime(entry.name, '%Y-%m-%d')
+        except ValueError:
+            continue # Not one of our day directories
+        for path in glob.glob(os.path.join(entry.path, '*.parquet*')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        try:
+            os.rmdir(entry.path) # Only succeeds once the directory is empty
+        except OSError:
+            pass
+
+
+def _write_parquet_cache(key, day, df):
+    """Best-effort write; the temp file + rename keeps readers from seeing half-written files."""
+    path = _parquet_cache_path(key, day)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _prune_parquet_cache(day)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(pa.Table.from_pandas(df), tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        warnings.warn(f"Could not write price cache {path}: {e}")
 
 # =============================================
 # === STOCK PRICE DATA (Adjusted Close) =====
 # =============================================
-@st.cache_data(ttl=3600) # Cache data for 1 hour
+# cache_resource hands back the same object without pickling/copying the frame on every
+# rerun; callers must treat the returned DataFrame as read-only.
+@st.cache_resource(ttl=3600, show_spinner=False) # Cache data for 1 hour
 def get_stock_data(tickers, start_date, end_date):
     """
     Fetches historical stock data (Adjusted Close) for one or more tickers.
@@ -22,6 +119,8 @@ def get_stock_data(tickers, start_date, end_date):
     Returns:
         pd.DataFrame: A DataFrame containing the 'Adj Close' prices for the requested tickers,
                       with tickers as column names. Returns an empty DataFrame on failure.
+                      Complete results are also stored as Parquet under .price_cache/<date>/ for the rest
+                      of the day, so restarts and new sessions skip the download.
     """
     # Ensure tickers is a list
     if isinstance(tickers, str):
@@ -37,6 +136,12 @@ def get_stock_data(tickers, start_date, end_date):
         return pd.DataFrame()
 
     num_tickers = len(tickers)
+    # Files live under a per-date directory so panels ending "today" are refreshed daily
+    disk_key = (tuple(tickers), str(start_date), str(end_date))
+    today = datetime.now().date().isoformat()
+    cached = _read_parquet_cache(disk_key, today)
+    if cached is not None:
+        return cached
     # st.write(f"Fetching Adj Close for: {', '.join(tickers)}") # Debugging fetch
 
     try:
@@ -46,8 +151,10 @@ def get_stock_data(tickers, start_date, end_date):
             start=start_date,
             end=end_date,
             progress=False, # Set to True for visual progress in console
-            # group_by='ticker' # Alternative grouping, but default is usually fine
-            auto_adjust=False # Set to False to get 'Adj Close' explicitly
+            group_by='column', # Price field on the top column level, so 'Adj Close' is one lookup
+            auto_adjust=False, # Set to False to get 'Adj Close' explicitly
+            threads=True, # Let yfinance fetch the tickers concurrently
+            session=_SESSION
         )
 
         if data.empty:
@@ -59,10 +166,9 @@ def get_stock_data(tickers, start_date, end_date):
         # Case 1: Multiple tickers OR Single ticker returned with MultiIndex columns
         if isinstance(data.columns, pd.MultiIndex):
             try:
-                 # Select only the 'Adj Close' price for all tickers
-                 adj_close_data = data.xs('Adj Close', level=0, axis=1)
-                 # Reindex to ensure all requested tickers are present, even if some failed partially
-                 adj_close_data = adj_close_data.reindex(columns=tickers)
+                 # Select only the 'Adj Close' price for all tickers (direct top-level indexing, no xs pass)
+                 # and reindex to ensure all requested tickers are present, even if some failed partially
+                 adj_close_data = data['Adj Close'].reindex(columns=tickers)
 
             except KeyError:
                  # If 'Adj Close' is not found (e.g., different yf version or data source issue)
@@ -94,6 +200,13 @@ def get_stock_data(tickers, start_date, end_date):
             st.warning(f"Data for ticker(s) {', '.join(all_nan_cols)} consists entirely of NaN values.")
             # Keep them for now, downstream functions should handle NaN
 
+        # A plain datetime64[ns] index keeps date lookups vectorized.
+        index = pd.to_datetime(adj_close_data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        adj_close_data.index = index.astype('datetime64[ns]')
+        if not all_nan_cols: # Don't pin a partial failure on disk for the rest of the day
+            _write_parquet_cache(disk_key, today, adj_close_data)
         return adj_close_data
 
     except Exception as e:
@@ -103,37 +216,128 @@ def get_stock_data(tickers, start_date, end_date):
         return pd.DataFrame()
 
 
+def _download_adj_close(ticker, start_date, end_date):
+    """Downloads the 'Adj Close' Series for a single ticker (one HTTP request)."""
+    data = yf.download(ticker, start=start_date, end=end_date, progress=False,
+                       auto_adjust=False, threads=False, session=_SESSION)
+    adj_close = data['Adj Close']
+    # Newer yfinance returns (Price, Ticker) MultiIndex columns even for a single ticker
+    if isinstance(adj_close, pd.DataFrame):
+        adj_close = adj_close.iloc[:, 0]
+    return adj_close
+
+
+def fetch_prices_parallel(tickers, start_date, end_date, max_workers=8):
+    """
+    Fetches 'Adj Close' prices with one yfinance request per ticker, issued concurrently.
+
+    The fetch is IO-bound, so a thread pool gives roughly min(N, max_workers)x speedup
+    over serial requests on a cold cache.
+
+    Args:
+        tickers (list): Ticker symbols.
+        start_date (datetime.date): Start date for data fetching.
+        end_date (datetime.date): End date for data fetching.
+        max_workers (int): Maximum number of concurrent requests.
+
+    Returns:
+        tuple: (prices, failed) where prices is a DataFrame of 'Adj Close' prices with tickers
+               as columns (in the requested order) and failed lists the tickers whose request
+               raised or returned no prices; those are left out of the DataFrame.
+    """
+    tickers = [t.strip().upper() for t in tickers if isinstance(t, str) and t.strip()]
+    if not tickers:
+        return pd.DataFrame(), []
+
+    prices = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_download_adj_close, t, start_date, end_date): t for t in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                prices[ticker] = future.result()
+            except Exception as e:
+                # Keep the other tickers; the failed one is reported back to the caller
+                warnings.warn(f"{ticker}: {e}")
+
+    if not prices:
+        return pd.DataFrame(), tickers
+    data = pd.concat({t: prices[t] for t in tickers if t in prices}, axis=1)
+    empty_cols = data.columns[data.isna().all()] # Per-column check on the small frame, done once here
+    failed = [t for t in tickers if t not in prices or t in empty_cols]
+    return data.drop(columns=empty_cols), failed
+
+
 # =============================================
 # === FUNDAMENTAL & OTHER INFO ==============
 # =============================================
 
-@st.cache_data(ttl=3600) # Cache for 1 hour
-def get_stock_info(ticker):
-    """Fetches fundamental information for a single ticker."""
-    try:
-        stock = yf.Ticker(ticker)
-        # .info can be slow or fail; consider alternatives if performance is critical
-        info = stock.info
-        # Basic validation: Check if the fetched info seems related to the requested ticker
-        if not info or 'symbol' not in info or info.get('symbol', '').upper() != ticker.upper():
-             # Handle cases where yfinance might return info for a different ticker (e.g., redirects)
-             # Or if info is empty/incomplete
-             st.warning(f"Could not retrieve complete or accurate info for {ticker}. Ticker might be invalid, delisted, or data unavailable.", icon="⚠️")
-             return None
-        return info
-    except Exception as e:
-        # Handle potential network errors, timeouts, or parsing issues
-        st.error(f"Error fetching info for {ticker}: {e}")
-        # Optionally log the error for debugging
-        # print(f"Detailed error fetching info for {ticker}: {traceback.format_exc()}")
+@st.cache_resource(show_spinner=False)
+def _info_disk_cache():
+    """Process-wide on-disk cache for .info dicts, or None if diskcache is not installed."""
+    return diskcache.Cache(_INFO_CACHE_DIR) if diskcache is not None else None
+
+
+def _fetch_info(stock, ticker):
+    """Fetches and validates .info for one yf.Ticker handle; None if missing or for another symbol."""
+    info = stock.info
+    if not info or 'symbol' not in info or info.get('symbol', '').upper() != ticker.upper():
         return None
+    return info
+
+
+@st.cache_data(ttl=3600, show_spinner=False) # Cache for 1 hour
+def get_stock_info_batch(tickers):
+    """
+    Fetches fundamental information for several tickers at once.
+
+    All symbols share one yf.Tickers session and their .info requests run concurrently.
+    Results are also kept on disk for 24 hours, keyed by (ticker, date), so app restarts
+    and new sessions do not hit the network again the same day.
+
+    Args:
+        tickers (tuple): Ticker symbols (a tuple, so it can be part of the cache key).
+
+    Returns:
+        dict: Ticker -> info dict, or None where the ticker is invalid or the fetch failed
+              (nothing is displayed; callers decide which tickers to warn about).
+    """
+    tickers = [t.strip().upper() for t in tickers if isinstance(t, str) and t.strip()]
+    today = datetime.now().date().isoformat()
+    disk = _info_disk_cache()
+
+    infos, missing = {}, []
+    for ticker in tickers:
+        cached = disk.get((ticker, today)) if disk is not None else None
+        if cached is not None:
+            infos[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if missing:
+        handles = yf.Tickers(' '.join(missing), session=_SESSION).tickers
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+            futures = {executor.submit(_fetch_info, handles[t], t): t for t in missing}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    infos[ticker] = future.result()
+                except Exception as e:
+                    # No st.* here: the page warns only for the ticker it is showing
+                    warnings.warn(f"Error fetching info for {ticker}: {e}")
+                    infos[ticker] = None
+                    continue
+                if infos[ticker] is not None and disk is not None:
+                    disk.set((ticker, today), infos[ticker], expire=_INFO_DISK_TTL)
+
+    return {t: infos.get(t) for t in tickers}
 
 
 @st.cache_data(ttl=86400) # Cache longer, recommendations don't change that often
 def get_recommendations(ticker):
     """Fetches analyst recommendations."""
     try:
-        stock = yf.Ticker(ticker)
+        stock = yf.Ticker(ticker, session=_SESSION)
         recom = stock.recommendations
         # Filter for recent recommendations if needed
         if recom is not None and not recom.empty:
@@ -143,7 +347,8 @@ def get_recommendations(ticker):
             recom = recom.sort_index(ascending=False)
         else:
              return pd.DataFrame() # Return empty if None or empty
-        return recom
+        # Arrow-backed columns let st.dataframe skip the NumPy -> Arrow conversion on each render
+        return recom.convert_dtypes(dtype_backend='pyarrow')
     except Exception as e:
         st.warning(f"Could not fetch recommendations for {ticker}: {e}", icon="⚠️")
         return pd.DataFrame() # Return empty dataframe on error
@@ -153,7 +358,7 @@ def get_recommendations(ticker):
 def get_earnings_history(ticker):
     """Fetches earnings history."""
     try:
-        stock = yf.Ticker(ticker)
+        stock = yf.Ticker(ticker, session=_SESSION)
         earnings = stock.earnings_history
         if earnings is not None and not earnings.empty:
              # Sort by date descending (often index is already date-like)
@@ -164,7 +369,7 @@ def get_earnings_history(ticker):
                  pass
         else:
             return pd.DataFrame() # Return empty if None or empty
-        return earnings
+        return earnings.convert_dtypes(dtype_backend='pyarrow') # Arrow-backed for st.dataframe
     except Exception as e:
         st.warning(f"Could not fetch earnings history for {ticker}: {e}", icon="⚠️")
         return pd.DataFrame()
@@ -3,7 +3,7 @@ import google.generativeai as genai
 import time # For potential retries or delays
 
 # --- Gemini Configuration ---
-@st.cache_resource # Cache the model resource
+@st.cache_resource(show_spinner=False) # Cache the model resource per API key
 def configure_gemini(api_key):
     """Configures the Gemini API and returns the model."""
     try:
@@ -14,17 +14,16 @@ def configure_gemini(api_key):
         st.error(f"Error configuring Gemini: {e}. Please check your API key in Settings.")
         return None
 
-def get_gemini_analysis(prompt, context_data=""):
+@st.cache_resource(ttl=600, show_spinner=False)
+def _streamed_responses():
     """
-    Gets analysis from Gemini, handling potential errors.
-
-    Args:
-        prompt (str): The specific question or instruction for Gemini.
-        context_data (str): Optional string containing data (metrics, signals) for context.
-
-    Returns:
-        str: The generated analysis from Gemini or an error message.
+    Completed answers keyed by (api_key, full_prompt), shared across pages and sessions,
+    so identical questions are not sent again. The whole store expires after 10 minutes.
     """
+    return {}
+
+def _model_error():
+    """Ensures a model is configured in session state; returns an error message, or None if ready."""
     if 'gemini_model' not in st.session_state or st.session_state.gemini_model is None:
         # Try to re-initialize if API key is available
         if st.session_state.get('gemini_api_key'):
@@ -33,34 +32,53 @@ def get_gemini_analysis(prompt, context_data=""):
                   return "Gemini model not configured. Please set your API key in Settings."
         else:
             return "Gemini API key not set. Please configure it in Settings."
+    return None
+
+def stream_gemini_analysis(prompt, context_data=""):
+    """
+    Gets analysis from Gemini, writing the answer into the current container as it
+    arrives instead of blocking until the full completion is ready.
 
-    model = st.session_state.gemini_model
+    Args:
+        prompt (str): The specific question or instruction for Gemini.
+        context_data (str): Optional string containing data (metrics, signals) for context.
+
+    Returns:
+        str: The generated analysis from Gemini or an error message (both already displayed).
+    """
+    error = _model_error()
+    if error:
+        st.markdown(error)
+        return error
+
+    api_key = st.session_state.gemini_api_key
     full_prompt = f"{context_data}\n\n---\n\n{prompt}"
+    responses = _streamed_responses()
+    if (api_key, full_prompt) in responses: # Same question answered recently: replay it
+        st.markdown(responses[(api_key, full_prompt)])
+        return responses[(api_key, full_prompt)]
 
     try:
-        # Add a spinner while waiting for the response
-        with st.spinner("🤖 Gemini is thinking..."):
-            response = model.generate_content(full_prompt)
-            # Handle potential safety blocks or empty responses
-            if not response.parts:
-                 # Check candidate for block reason if possible
-                 try:
-                      block_reason = response.candidates[0].finish_reason
-                      safety_ratings = response.candidates[0].safety_ratings
-                      return f"Analysis blocked by Gemini. Reason: {block_reason}. Ratings: {safety_ratings}"
-                 except Exception:
-                      return "Gemini returned an empty response. The prompt might have been blocked."
+        response = configure_gemini(api_key).generate_content(full_prompt, stream=True)
+        # Blocked chunks carry no parts; skip them rather than raising from chunk.text
+        text = st.write_stream(chunk.text for chunk in response if chunk.parts)
 
-            return response.text # Or response.parts[0].text depending on API version/model
+        # Safety blocks are only known once the stream is exhausted
+        candidate = response.candidates[0] if response.candidates else None
+        finish_reason = getattr(candidate, 'finish_reason', None)
+        if not text:
+            if candidate is not None:
+                message = f"Analysis blocked by Gemini. Reason: {finish_reason}. Ratings: {candidate.safety_ratings}"
+            else:
+                message = "Gemini returned an empty response. The prompt might have been blocked."
+            st.markdown(message)
+            return message
+        if getattr(finish_reason, 'name', None) == 'STOP': # Only keep complete answers
+            responses[(api_key, full_prompt)] = text
+        else:
+            st.warning(f"Gemini stopped early. Reason: {finish_reason}")
+        return text
 
     except Exception as e:
         st.error(f"An error occurred while querying Gemini: {e}")
-        # Simple retry logic (optional)
-        # try:
-        #     time.sleep(2)
-        #     response = model.generate_content(full_prompt)
-        #     return response.text
-        # except Exception as e2:
-        #      st.error(f"Retry failed: {e2}")
-        #      return f"Error contacting Gemini: {e2}"
-        return f"Error contacting Gemini: {e}"
\ No newline at end of file
+        return f"Error contacting Gemini: {e}"
@@ -0,0 +1,79 @@
+# utils/indicators_nb.py
+import numpy as np
+from .jit import njit
+
+@njit(cache=True, fastmath=True)
+def price_overlays(x, w_bb, k, w_fast, w_slow):
+    """
+    Bollinger Bands plus two SMAs from one forward pass over the prices, using running sums.
+
+    Args:
+        x (np.ndarray): Contiguous float64 prices without NaNs.
+        w_bb (int): Bollinger window length.
+        k (float): Number of standard deviations for the bands.
+        w_fast (int): Fast SMA window length.
+        w_slow (int): Slow SMA window length.
+
+    Returns:
+        tuple: (sma_bb, upper, lower, sma_fast, sma_slow) arrays, NaN until each window fills.
+               The band std uses ddof=1 to match pandas' rolling().std().
+    """
+    n = len(x)
+    sma_bb = np.full(n, np.nan)
+    up = np.full(n, np.nan)
+    lo = np.full(n, np.nan)
+    sma_fast = np.full(n, np.nan)
+    sma_slow = np.full(n, np.nan)
+    s_bb = 0.0
+    s2_bb = 0.0
+    s_fast = 0.0
+    s_slow = 0.0
+    for i in range(n):
+        xi = x[i]
+        s_bb += xi
+        s2_bb += xi * xi
+        s_fast += xi
+        s_slow += xi
+        if i >= w_bb:
+            s_bb -= x[i - w_bb]
+            s2_bb -= x[i - w_bb] * x[i - w_bb]
+        if i >= w_fast:
+            s_fast -= x[i - w_fast]
+        if i >= w_slow:
+            s_slow -= x[i - w_slow]
+        if i >= w_bb - 1:
+            m = s_bb / w_bb
+            v = (s2_bb - s_bb * m) / (w_bb - 1)
+            sd = np.sqrt(v) if v > 0 else 0.0
+            sma_bb[i] = m
+            up[i] = m + k * sd
+            lo[i] = m - k * sd
+        if i >= w_fast - 1:
+            sma_fast[i] = s_fast / w_fast
+        if i >= w_slow - 1:
+            sma_slow[i] = s_slow / w_slow
+    return sma_bb, up, lo, sma_fast, sma_slow
+
+
+@njit(cache=True)
+def ema_nb(x, span):
+    """
+    EMA recurrence y[i] = a*x[i] + (1-a)*y[i-1] with a = 2/(span+1), i.e. pandas'
+    ewm(span=span, adjust=False).mean(). Leading NaNs stay NaN; later NaNs carry the last value.
+    (No fastmath here: it would let the compiler drop the NaN checks.)
+    """
+    n = len(x)
+    y = np.empty(n)
+    alpha = 2.0 / (span + 1.0)
+    prev = np.nan
+    for i in range(n):
+        xi = x[i]
+        if np.isnan(xi):
+            y[i] = prev
+        elif np.isnan(prev):
+            prev = xi
+            y[i] = xi
+        else:
+            prev = alpha * xi + (1.0 - alpha) * prev
+            y[i] = prev
+    return y
@@ -1,45 +1,79 @@
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve, LinAlgError
 from .statistics_utils import calculate_returns # Import from sibling module
 
-def calculate_portfolio_performance(weights, mean_returns, cov_matrix):
-    """Calculates portfolio return, volatility."""
-    portfolio_return = np.sum(mean_returns * weights) * 252  # Annualized return
-    portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))) * np.sqrt(252) # Annualized volatility
+def calculate_portfolio_performance(weights, mean_ann, cov_ann):
+    """
+    Calculates portfolio return, volatility.
+
+    Args:
+        weights (np.ndarray): Portfolio weights.
+        mean_ann (np.ndarray): Annualized mean returns (daily mean * 252).
+        cov_ann (np.ndarray): Annualized covariance matrix (daily covariance * 252).
+
+    Returns:
+        tuple: (annualized return, annualized volatility).
+    """
+    portfolio_return = mean_ann @ weights
+    portfolio_volatility = np.sqrt(np.einsum('i,ij,j->', weights, cov_ann, weights)) # No w'Σ temporary
     return portfolio_return, portfolio_volatility
 
-def calculate_neg_sharpe_ratio(weights, mean_returns, cov_matrix, risk_free_rate):
+def calculate_neg_sharpe_ratio(weights, mean_ann, cov_ann, risk_free_rate):
     """Calculates the negative Sharpe ratio (for minimization)."""
-    p_return, p_volatility = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
+    p_return, p_volatility = calculate_portfolio_performance(weights, mean_ann, cov_ann)
     if p_volatility == 0:
         return np.inf # Avoid division by zero; assign high value
     return -(p_return - risk_free_rate) / p_volatility
 
-def calculate_portfolio_variance(weights, mean_returns, cov_matrix):
+def calculate_portfolio_variance(weights, mean_ann, cov_ann):
      """Calculates portfolio variance (or volatility for minimization)."""
      # We minimize volatility which is sqrt(variance), it yields the same weights.
      # Directly using variance avoids sqrt calculation in the optimizer loop.
      # return np.dot(weights.T, np.dot(cov_matrix, weights)) * 252 # Annualized Variance
-     _, portfolio_volatility = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
+     _, portfolio_volatility = calculate_portfolio_performance(weights, mean_ann, cov_ann)
      return portfolio_volatility # Return volatility as it's more interpretable
 
+def _vol_grad(weights, mean_ann, cov_ann):
+    """Gradient of the portfolio volatility: Σw / sqrt(w'Σw)."""
+    cov_w = cov_ann @ weights
+    vol = np.sqrt(weights @ cov_w)
+    return cov_w / vol if vol > 0 else np.zeros_like(weights)
+
+def _neg_sharpe_grad(weights, mean_ann, cov_ann, risk_free_rate):
+    """Gradient of the negative Sharpe ratio (quotient rule on (μ'w - rf) / σ)."""
+    cov_w = cov_ann @ weights
+    vol = np.sqrt(weights @ cov_w)
+    if vol == 0:
+        return np.zeros_like(weights)
+    excess = mean_ann @ weights - risk_free_rate
+    return -mean_ann / vol + excess * cov_w / vol**3
+
+def _sum_grad(weights):
+    """Gradient of the sum-to-one constraint."""
+    return np.ones_like(weights)
+
 
 def find_optimal_portfolio(opt_type, mean_returns, cov_matrix, risk_free_rate, num_assets, constraints, bounds):
-    """Finds the optimal portfolio based on the optimization type."""
+    """Finds the optimal portfolio based on the optimization type (daily mean returns and covariance)."""
+    # Annualize once here rather than in every objective call SLSQP makes
+    mean_ann = np.asarray(mean_returns, dtype=np.float64) * 252
+    cov_ann = np.asarray(cov_matrix, dtype=np.float64) * 252
     if opt_type == 'max_sharpe':
-        objective = calculate_neg_sharpe_ratio
-        args = (mean_returns, cov_matrix, risk_free_rate)
+        objective, jac = calculate_neg_sharpe_ratio, _neg_sharpe_grad
+        args = (mean_ann, cov_ann, risk_free_rate)
     elif opt_type == 'min_volatility':
-        objective = calculate_portfolio_variance
-        args = (mean_returns, cov_matrix) # risk_free_rate not needed for min vol
+        objective, jac = calculate_portfolio_variance, _vol_grad
+        args = (mean_ann, cov_ann) # risk_free_rate not needed for min vol
     else:
         raise ValueError("Invalid optimization type specified.")
 
     # Initial guess (equal weights)
     init_guess = np.array(num_assets * [1. / num_assets])
 
-    result = minimize(objective, init_guess, args=args, method='SLSQP', bounds=bounds, constraints=constraints)
+    # Analytic gradients spare SLSQP num_assets+1 objective calls per finite-difference Jacobian
+    result = minimize(objective, init_guess, args=args, jac=jac, method='SLSQP', bounds=bounds, constraints=constraints)
 
     if not result.success:
         # Handle optimization failure (e.g., return None or raise an error)
@@ -49,56 +83,146 @@ def find_optimal_portfolio(opt_type, mean_returns, cov_matrix, risk_free_rate, n
     optimal_weights = result.x
     return optimal_weights
 
+def _cov_solves(mean_ann, cov_ann):
+    """
+    inv(S)1 and inv(S)mu from one Cholesky factorization of the annualized covariance S.
+
+    Returns:
+        tuple: (inv_1, inv_mu), or None if the covariance is not positive definite.
+    """
+    try:
+        chol = cho_factor(cov_ann)
+    except LinAlgError:
+        return None
+    return cho_solve(chol, np.ones(len(mean_ann))), cho_solve(chol, mean_ann)
+
+def _analytic_frontier_weights(mean_ann, inv_1, inv_mu, target_returns):
+    """
+    Closed-form Markowitz frontier for the sum-to-one and target-return constraints only
+    (no bounds): w(t) = a(t)*inv(S)1 + b(t)*inv(S)mu, where a, b solve a 2x2 system in
+    A = 1'inv(S)1, B = 1'inv(S)mu, C = mu'inv(S)mu.
+
+    Returns:
+        np.ndarray: (len(target_returns), num_assets) weights, or None if the mean returns
+                    are degenerate.
+    """
+    A = inv_1.sum()
+    B = inv_mu.sum()
+    C = mean_ann @ inv_mu
+    D = A * C - B * B
+    if D <= 1e-12 * max(A * C, 1.0): # All assets (nearly) share one mean return
+        return None
+    a = (C - B * target_returns) / D
+    b = (A * target_returns - B) / D
+    return a[:, None] * inv_1 + b[:, None] * inv_mu
+
+def _analytic_min_vol_weights(inv_1):
+    """Global minimum-variance portfolio (sum-to-one only): inv(S)1 / 1'inv(S)1."""
+    return inv_1 / inv_1.sum()
+
+def _analytic_max_sharpe_weights(inv_1, inv_mu, risk_free_rate):
+    """
+    Tangency portfolio (sum-to-one only): inv(S)(mu - rf*1), normalized to sum to one.
+
+    Returns:
+        np.ndarray: Weights, or None when the minimum-variance return does not exceed the
+                    risk-free rate (the normalized solution would then minimize the Sharpe ratio).
+    """
+    excess = inv_mu - risk_free_rate * inv_1
+    scale = excess.sum()
+    if scale <= 0:
+        return None
+    return excess / scale
+
+def _within_bounds(weights, bounds, tol=1e-9):
+    """Row mask of weight vectors that satisfy scipy-style (low, high) bounds (None = unbounded)."""
+    low = np.array([-np.inf if b[0] is None else b[0] for b in bounds])
+    high = np.array([np.inf if b[1] is None else b[1] for b in bounds])
+    return np.all((weights >= low - tol) & (weights <= high + tol), axis=1)
+
+def _batch_performance(weights, mean_ann, cov_ann):
+    """
+    Scores many portfolios at once. With cov = L L', each variance is ||L'w||^2, so a
+    single (p x n) @ (n x n) product replaces p separate w'Σw evaluations.
+
+    Returns:
+        tuple: (returns, volatilities) arrays of length p (annualized).
+    """
+    try:
+        # The tiny ridge guards near-singular covariances
+        chol_lower = np.linalg.cholesky(cov_ann + 1e-12 * np.eye(len(cov_ann)))
+    except LinAlgError:
+        return weights @ mean_ann, np.sqrt(np.einsum('ki,ij,kj->k', weights, cov_ann, weights))
+    lw = weights @ chol_lower
+    return weights @ mean_ann, np.sqrt((lw * lw).sum(axis=1))
+
 def generate_efficient_frontier(mean_returns, cov_matrix, num_portfolios, risk_free_rate, constraints, bounds):
     """Generates portfolios for the efficient frontier."""
-    results = np.zeros((3 + len(mean_returns), num_portfolios)) # Return, Volatility, Sharpe, Weights...
     num_assets = len(mean_returns)
     init_guess = np.array(num_assets * [1. / num_assets])
+    mean_ann = mean_returns.to_numpy(dtype=np.float64) * 252
+    cov_ann = cov_matrix.to_numpy(dtype=np.float64) * 252
+
+    # Closed-form optimal portfolios when they already satisfy the bounds (the unbounded
+    # optimum is then also the bounded one); SLSQP only for the rest
+    solves = _cov_solves(mean_ann, cov_ann)
+    max_sharpe_weights = min_vol_weights = None
+    if solves is not None:
+        inv_1, inv_mu = solves
+        candidate = _analytic_max_sharpe_weights(inv_1, inv_mu, risk_free_rate)
+        if candidate is not None and _within_bounds(candidate[None, :], bounds)[0]:
+            max_sharpe_weights = candidate
+        candidate = _analytic_min_vol_weights(inv_1)
+        if _within_bounds(candidate[None, :], bounds)[0]:
+            min_vol_weights = candidate
 
     # Max Sharpe Portfolio (tangency portfolio)
-    max_sharpe_weights = find_optimal_portfolio('max_sharpe', mean_returns, cov_matrix, risk_free_rate, num_assets, constraints, bounds)
+    if max_sharpe_weights is None:
+        max_sharpe_weights = find_optimal_portfolio('max_sharpe', mean_returns, cov_matrix, risk_free_rate, num_assets, constraints, bounds)
     if max_sharpe_weights is None: return pd.DataFrame() # Optimization failed
-    max_sharpe_ret, max_sharpe_vol = calculate_portfolio_performance(max_sharpe_weights, mean_returns, cov_matrix)
-    max_sharpe_ratio = (max_sharpe_ret - risk_free_rate) / max_sharpe_vol
+    max_sharpe_ret = mean_ann @ max_sharpe_weights # Only the return is needed to span the targets
 
     # Min Volatility Portfolio
-    min_vol_weights = find_optimal_portfolio('min_volatility', mean_returns, cov_matrix, risk_free_rate, num_assets, constraints, bounds)
+    if min_vol_weights is None:
+        min_vol_weights = find_optimal_portfolio('min_volatility', mean_returns, cov_matrix, risk_free_rate, num_assets, constraints, bounds)
     if min_vol_weights is None: return pd.DataFrame() # Optimization failed
-    min_vol_ret, min_vol_vol = calculate_portfolio_performance(min_vol_weights, mean_returns, cov_matrix)
-    min_vol_sharpe = (min_vol_ret - risk_free_rate) / min_vol_vol if min_vol_vol != 0 else 0
-
-    # Store optimal portfolios
-    results[0,0], results[1,0], results[2,0] = min_vol_ret, min_vol_vol, min_vol_sharpe
-    results[3:,0] = min_vol_weights
-    results[0,1], results[1,1], results[2,1] = max_sharpe_ret, max_sharpe_vol, max_sharpe_ratio
-    results[3:,1] = max_sharpe_weights
+    min_vol_ret = mean_ann @ min_vol_weights
 
     # Generate other frontier points by varying target return
     target_returns = np.linspace(min_vol_ret, max_sharpe_ret * 1.2, num_portfolios - 2) # Extend slightly beyond max sharpe return
 
-    frontier_idx = 2
-    for target_ret in target_returns:
+    # Solve every target at once in closed form; SLSQP is only needed where the
+    # analytic weights violate the bounds (e.g. they require short selling)
+    analytic_weights = _analytic_frontier_weights(mean_ann, *solves, target_returns) if solves is not None else None
+    if analytic_weights is not None:
+        analytic_ok = _within_bounds(analytic_weights, bounds)
+    else:
+        analytic_ok = np.zeros(len(target_returns), dtype=bool)
+
+    # Only collect weights here; every portfolio is scored in one batch below
+    weights_list = [min_vol_weights, max_sharpe_weights]
+    for k, target_ret in enumerate(target_returns):
+        if analytic_ok[k]:
+            weights_list.append(analytic_weights[k])
+            continue
         # Constraint: Portfolio return must equal the target return
         eff_constraints = (
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1}, # Sum weights = 1
-            {'type': 'eq', 'fun': lambda w: calculate_portfolio_performance(w, mean_returns, cov_matrix)[0] - target_ret} # Target return
+            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': _sum_grad}, # Sum weights = 1
+            {'type': 'eq', 'fun': lambda w: mean_ann @ w - target_ret, 'jac': lambda w: mean_ann} # Target return
         )
         # Minimize volatility for the target return
-        result = minimize(calculate_portfolio_variance, init_guess, args=(mean_returns, cov_matrix), method='SLSQP', bounds=bounds, constraints=eff_constraints)
-
-        if result.success:
-            weights = result.x
-            p_ret, p_vol = calculate_portfolio_performance(weights, mean_returns, cov_matrix)
-            p_sharpe = (p_ret - risk_free_rate) / p_vol if p_vol != 0 else 0
-            results[0,frontier_idx], results[1,frontier_idx], results[2,frontier_idx] = p_ret, p_vol, p_sharpe
-            results[3:, frontier_idx] = weights
-            frontier_idx += 1
-
-    # Convert results to DataFrame
-    columns = [f'Portfolio {i+1}' for i in range(frontier_idx)] # Only include successfully generated portfolios
-    results_df = pd.DataFrame(results[:, :frontier_idx], index=['Return', 'Volatility', 'Sharpe Ratio'] + list(mean_returns.index), columns=columns)
-
-    # Add specific labels for Min Vol and Max Sharpe portfolios for easy identification
-    results_df = results_df.rename(columns={'Portfolio 1': 'Min Volatility', 'Portfolio 2': 'Max Sharpe'})
-
-    return results_df.T # Transpose so portfolios are rows
\ No newline at end of file
+        result = minimize(calculate_portfolio_variance, init_guess, args=(mean_ann, cov_ann), jac=_vol_grad, method='SLSQP', bounds=bounds, constraints=eff_constraints)
+        if result.success: # Only include successfully generated portfolios
+            weights_list.append(result.x)
+
+    weights = np.vstack(weights_list)
+    p_rets, p_vols = _batch_performance(weights, mean_ann, cov_ann)
+    safe_vols = np.where(p_vols != 0, p_vols, 1.0)
+    p_sharpes = np.where(p_vols != 0, (p_rets - risk_free_rate) / safe_vols, 0.0)
+
+    # Convert results to DataFrame, portfolios as rows; the first two rows carry
+    # specific labels for Min Vol and Max Sharpe portfolios for easy identification
+    index = ['Min Volatility', 'Max Sharpe'] + [f'Portfolio {i+1}' for i in range(2, len(weights))]
+    results_df = pd.DataFrame(np.column_stack([p_rets, p_vols, p_sharpes, weights]), index=index,
+                              columns=['Return', 'Volatility', 'Sharpe Ratio'] + list(mean_returns.index))
+    return results_df
@@ -0,0 +1,19 @@
+# utils/sim_stats.py
+import numpy as np
+
+def summarize(values):
+    """
+    Mean, median and 5th/95th percentiles of simulation outcomes.
+
+    np.percentile with several q values partitions the array once for all of them
+    (O(N) introselect), instead of one pass per statistic or a full sort.
+
+    Args:
+        values (array-like): Simulated outcomes.
+
+    Returns:
+        tuple: (mean, median, p5, p95) as floats.
+    """
+    a = np.asarray(values, dtype=np.float64)
+    p5, median, p95 = np.percentile(a, [5, 50, 95])
+    return float(a.mean()), float(median), float(p5), float(p95)
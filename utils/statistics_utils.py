@@ -1,54 +1,120 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import norm, skew, kurtosis
-import plotly.figure_factory as ff
+from scipy.stats import norm, gaussian_kde
 import plotly.graph_objects as go
+from .jit import njit
 
 def calculate_returns(data):
-    """Calculates daily percentage returns."""
-    if isinstance(data, pd.Series):
-        return data.pct_change().dropna()
-    elif isinstance(data, pd.DataFrame):
-        return data.pct_change().dropna()
-    else:
+    """Calculates daily percentage returns (rows with any NaN dropped)."""
+    if not isinstance(data, (pd.Series, pd.DataFrame)):
         raise ValueError("Input data must be a pandas Series or DataFrame")
+    # Same values as pct_change().dropna(), but one ratio pass on the ndarray and a single allocation
+    v = data.to_numpy()
+    r = v[1:] / v[:-1] - 1.0
+    keep = ~np.isnan(r) if r.ndim == 1 else ~np.isnan(r).any(axis=1)
+    index = data.index[1:][keep]
+    if isinstance(data, pd.Series):
+        return pd.Series(r[keep], index=index, name=data.name)
+    return pd.DataFrame(r[keep], index=index, columns=data.columns)
+
+@njit(cache=True)
+def moments(x):
+    """
+    Mean, variance, skewness and excess kurtosis in one pass (Welford-style updates of M2-M4).
+
+    Args:
+        x (np.ndarray): float64 values without NaNs.
+
+    Returns:
+        tuple: (mean, variance (ddof=1), skewness, kurtosis). Skewness and kurtosis are the
+               biased estimators with Fisher's definition (normal=0), as scipy.stats defaults.
+    """
+    n = 0
+    m1 = 0.0
+    m2 = 0.0
+    m3 = 0.0
+    m4 = 0.0
+    for v in x:
+        n1 = n
+        n += 1
+        d = v - m1
+        dn = d / n
+        dn2 = dn * dn
+        t = d * dn * n1
+        m1 += dn
+        m4 += t * dn2 * (n * n - 3 * n + 3) + 6.0 * dn2 * m2 - 4.0 * dn * m3
+        m3 += t * dn * (n - 2) - 3.0 * dn * m2
+        m2 += t
+    if n < 2:
+        return m1, np.nan, np.nan, np.nan
+    if m2 == 0.0:
+        return m1, 0.0, np.nan, np.nan
+    return m1, m2 / (n - 1), np.sqrt(n) * m3 / m2 ** 1.5, n * m4 / (m2 * m2) - 3.0
 
 def calculate_statistics(returns):
-    """Calculates key statistics for a series of returns."""
-    if returns.empty:
+    """Calculates key statistics for a NaN-free Series or ndarray of returns."""
+    returns = np.asarray(returns, dtype=np.float64) # ndarray path skips pandas index handling
+    if returns.size == 0:
         return {}
+    mean, variance, skewness, kurt = moments(returns) # One pass instead of four
+    std = np.sqrt(variance)
     stats = {
-        'Mean Return (Ann)': returns.mean() * 252,
-        'Volatility (Ann)': returns.std() * np.sqrt(252),
-        'Median Return': returns.median(),
-        'Variance': returns.var(),
-        'Skewness': skew(returns),
-        'Kurtosis': kurtosis(returns) # Fisher's definition (normal=0)
+        'Mean Return (Daily)': mean, # Daily moments can be handed to calculate_sharpe_ratio
+        'Std Dev (Daily)': std,
+        'Mean Return (Ann)': mean * 252,
+        'Volatility (Ann)': std * np.sqrt(252),
+        'Median Return': np.median(returns),
+        'Variance': variance,
+        'Skewness': skewness,
+        'Kurtosis': kurt # Fisher's definition (normal=0)
     }
     return stats
 
-def calculate_sharpe_ratio(returns, risk_free_rate):
-    """Calculates the annualized Sharpe Ratio."""
-    if returns.empty or returns.std() == 0:
+def calculate_sharpe_ratio(returns, risk_free_rate, mean=None, std=None):
+    """
+    Calculates the annualized Sharpe Ratio from a NaN-free Series or ndarray of daily returns.
+
+    mean/std (daily, std with ddof=1) may be passed in, e.g. from calculate_statistics,
+    to skip recomputing them.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.size == 0:
+        return 0
+    if mean is None:
+        mean = returns.mean()
+    if std is None:
+        std = returns.std(ddof=1)
+    if std == 0 or np.isnan(std):
         return 0
-    excess_returns = returns.mean() - (risk_free_rate / 252) # Daily risk-free rate
-    sharpe = (excess_returns / returns.std()) * np.sqrt(252) # Annualize
+    excess_returns = mean - (risk_free_rate / 252) # Daily risk-free rate
+    sharpe = (excess_returns / std) * np.sqrt(252) # Annualize
     return sharpe
 
 def plot_return_distribution(returns, ticker_name):
-    """Plots the distribution of returns using Plotly."""
-    if returns.empty:
+    """Plots the distribution of returns (Series or ndarray) using Plotly."""
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[~np.isnan(returns)]
+    if returns.size == 0:
         return go.Figure()
 
-    # Create distribution plot with histogram and kernel density estimate (KDE)
-    fig = ff.create_distplot(
-        [returns.dropna()],
-        group_labels=[f'{ticker_name} Daily Returns'],
-        bin_size=0.005,  # Adjust bin size as needed
-        show_hist=True,
-        show_rug=False,
-        show_curve=True
-    )
+    # Histogram and kernel density estimate (KDE) precomputed in NumPy/SciPy: the KDE is
+    # evaluated on a 256-point grid and only bin heights/curve points go to Plotly
+    label = f'{ticker_name} Daily Returns'
+    bin_size = 0.005  # Adjust bin size as needed
+    edges = np.arange(returns.min(), returns.max() + bin_size, bin_size)
+    if len(edges) < 2:
+        edges = np.array([returns.min(), returns.min() + bin_size])
+    density, edges = np.histogram(returns, bins=edges, density=True)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=density, width=np.diff(edges),
+                         opacity=0.7, name=label, legendgroup=label))
+    try:
+        grid = np.linspace(returns.min(), returns.max(), 256)
+        fig.add_trace(go.Scatter(x=grid, y=gaussian_kde(returns)(grid), mode='lines',
+                                 name=label, legendgroup=label, showlegend=False))
+    except (np.linalg.LinAlgError, ValueError):
+        pass # Too few or identical returns for a KDE; show the histogram alone
 
     # Add vertical line for mean return
     mean_return = returns.mean()
@@ -0,0 +1,18 @@
+# utils/tickers.py
+import functools
+import re
+
+_SPLIT = re.compile(r'[\s,;]+') # Commas, semicolons and/or whitespace
+
+@functools.lru_cache(maxsize=128)
+def parse_tickers(s):
+    """
+    Parses a free-form ticker string into upper-cased, de-duplicated symbols.
+
+    Args:
+        s (str): Tickers separated by commas, semicolons or whitespace.
+
+    Returns:
+        tuple: Symbols in first-seen order (hashable, so usable in cache keys).
+    """
+    return tuple(dict.fromkeys(t.upper() for t in _SPLIT.split(s) if t))